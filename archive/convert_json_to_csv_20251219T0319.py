@@ -9,23 +9,52 @@ Usage:
 Or install dependencies first:
     pip install --user pandas numpy
     python3 convert_json_to_csv.py
+
+orjson is used for parsing when installed (pip install --user orjson);
+otherwise the stdlib json module is used.
 """
 
 import json
 import os
 import glob
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import List, Dict
 
 try:
     import pandas as pd
     import numpy as np
+    from dateutil.tz import tzlocal
 except ImportError:
     print("Error: pandas and numpy are required.")
     print("Install them with: pip install --user pandas numpy")
     exit(1)
 
-def clean_linkedin_post_data(posts: List[Dict]) -> List[Dict]:
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _load_json(json_file: str):
+    """Parse a JSON file, preferring orjson's C parser over stdlib json."""
+    with open(json_file, 'rb') as f:
+        raw = f.read()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+STAT_KEYS = ['total_reactions', 'like', 'love', 'celebrate', 'support', 'insight', 'comments', 'reposts']
+
+
+def _has_key(posts: List[Dict], field: str) -> pd.Series:
+    """True where the raw post dict has the key, even if its value is null."""
+    return pd.Series([field in post for post in posts], dtype=bool)
+
+
+def clean_linkedin_post_data(posts: List[Dict]) -> pd.DataFrame:
     """
     Clean and validate LinkedIn post data.
     
@@ -33,11 +62,38 @@ def clean_linkedin_post_data(posts: List[Dict]) -> List[Dict]:
         posts: List of post dictionaries from JSON files
         
     Returns:
-        List of cleaned post dictionaries
+        DataFrame of cleaned posts with nested fields flattened
+        (e.g. 'stats.like', 'author.name')
     """
-    cleaned_posts = []
-    seen_urns = set()
-    
+    if not posts:
+        return pd.DataFrame()
+    
+    # Top-level fields only; nested dicts stay as objects
+    records = pd.DataFrame.from_records(posts)
+    
+    # Check for duplicates using activity_urn or full_urn (first occurrence wins,
+    # whether or not it later passes validation)
+    urn = pd.Series(None, index=records.index, dtype=object)
+    for field in ('full_urn', 'activity_urn'):
+        if field in records.columns:
+            value = records[field]
+            urn = value.where(value.notna() & value.ne(''), urn)
+    duplicate = urn.notna() & urn.duplicated(keep='first')
+    
+    # Validate required fields, attributing each dropped post to its first failure
+    text = records['text'] if 'text' in records.columns else pd.Series(None, index=records.index, dtype=object)
+    # Key absence is checked on the raw dicts: a DataFrame can't tell a missing
+    # key from an explicit null, and a null text counts as empty, not missing
+    missing_text = ~_has_key(posts, 'text')
+    empty_text = ~missing_text & (text.isna() | text.astype(str).str.strip().eq(''))
+    checks = [
+        ('duplicates', duplicate),
+        ('missing_text', missing_text),
+        ('empty_text', empty_text),
+        ('missing_stats', ~_has_key(posts, 'stats')),
+        ('missing_author', ~_has_key(posts, 'author')),
+        ('missing_timestamp', ~_has_key(posts, 'posted_at')),
+    ]
     issues = {
         'missing_text': 0,
         'empty_text': 0,
@@ -46,184 +102,146 @@ def clean_linkedin_post_data(posts: List[Dict]) -> List[Dict]:
         'missing_timestamp': 0,
         'duplicates': 0,
     }
+    keep = pd.Series(True, index=records.index)
+    for name, failed in checks:
+        issues[name] = int((keep & failed).sum())
+        keep &= ~failed
     
-    for post in posts:
-        # Check for duplicates using activity_urn or full_urn
-        urn = post.get('activity_urn') or post.get('full_urn')
-        if urn and urn in seen_urns:
-            issues['duplicates'] += 1
-            continue
-        if urn:
-            seen_urns.add(urn)
-        
-        # Validate required fields
-        if 'text' not in post:
-            issues['missing_text'] += 1
-            continue
-        
-        if not post['text'] or not post['text'].strip():
-            issues['empty_text'] += 1
-            continue
-        
-        if 'stats' not in post:
-            issues['missing_stats'] += 1
-            continue
-        
-        if 'author' not in post:
-            issues['missing_author'] += 1
-            continue
-        
-        if 'posted_at' not in post:
-            issues['missing_timestamp'] += 1
-            continue
-        
+    kept_posts = [posts[i] for i in np.flatnonzero(keep.to_numpy())]
+    df = pd.json_normalize(kept_posts, sep='.') if kept_posts else pd.DataFrame()
+    
+    if not df.empty:
         # Ensure all stats fields exist
-        if 'stats' in post:
-            stats = post['stats']
-            for stat_key in ['total_reactions', 'like', 'love', 'celebrate', 'support', 'insight', 'comments', 'reposts']:
-                if stat_key not in stats:
-                    stats[stat_key] = 0
+        for stat_key in STAT_KEYS:
+            column = f'stats.{stat_key}'
+            df[column] = df[column].fillna(0) if column in df.columns else 0
         
         # Infer source_company from author.name if missing
-        if 'source_company' not in post or not post['source_company']:
-            if 'author' in post and 'name' in post['author']:
-                post['source_company'] = post['author']['name'].lower()
+        if 'author.name' in df.columns:
+            source = df['source_company'] if 'source_company' in df.columns else pd.Series(None, index=df.index, dtype=object)
+            needs_source = (source.isna() | source.eq('')) & df['author.name'].notna()
+            df['source_company'] = source.where(~needs_source, df['author.name'].astype(str).str.lower())
         
         # Trim whitespace from text
-        post['text'] = post['text'].strip()
+        df['text'] = df['text'].str.strip()
         
         # Remove null document fields
-        if 'document' in post and post['document'] is None:
-            del post['document']
-        
-        cleaned_posts.append(post)
+        if 'document' in df.columns and df['document'].isna().all():
+            df = df.drop(columns='document')
     
     if any(issues.values()):
         print(f"  Cleaning issues: {issues}")
     
-    return cleaned_posts
+    return df
 
 
-def transform_post_to_row(post: Dict) -> Dict:
+OUTPUT_COLUMNS = [
+    'post_text',
+    'job_role',
+    'affiliation',
+    'account_age',
+    'audience_size',
+    'baseline_engagement',
+    'time_window',
+    'pct_positive',
+    'pct_negative',
+    'comment_sentiment_dist',
+    'engagement_velocity',
+]
+
+
+def _numeric_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """Return a numeric column from a normalized frame, defaulting to 0."""
+    if column not in df.columns:
+        return pd.Series(0.0, index=df.index)
+    return pd.to_numeric(df[column], errors='coerce').fillna(0).astype(float)
+
+
+def transform_posts_to_frame(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Transform a single post dictionary to a flat row dictionary.
+    Transform cleaned, flattened posts into output rows in one vectorized pass.
     """
-    # Skip posts without required fields
-    if not post.get('text') or not post.get('stats'):
-        return None
-    
-    # Extract basic fields
-    post_text = post.get('text', '')
-    stats = post.get('stats', {})
-    author = post.get('author', {})
-    posted_at = post.get('posted_at', {})
-    
+    if df.empty:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+    # Skip posts without required fields (empty stats dicts normalize to no columns)
+    text = df['text'] if 'text' in df.columns else pd.Series(None, index=df.index, dtype=object)
+    stats_cols = [c for c in df.columns if c.startswith('stats.')]
+    has_stats = df[stats_cols].notna().any(axis=1) if stats_cols else pd.Series(False, index=df.index)
+    df = df[text.fillna('').astype(bool) & has_stats]
+    if df.empty:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
     # Calculate engagement metrics
-    total_reactions = stats.get('total_reactions', 0)
-    like_count = stats.get('like', 0)
-    love_count = stats.get('love', 0)
-    celebrate_count = stats.get('celebrate', 0)
-    support_count = stats.get('support', 0)
-    insight_count = stats.get('insight', 0)
-    comments_count = stats.get('comments', 0)
-    reposts_count = stats.get('reposts', 0)
-    
-    # Calculate pct_positive (positive reactions / total reactions * 100)
-    positive_reactions = like_count + love_count + celebrate_count + support_count
-    if total_reactions > 0:
-        pct_positive = (positive_reactions / total_reactions) * 100
-        pct_negative = (insight_count / total_reactions) * 100
-    else:
-        pct_positive = 0.0
-        pct_negative = 0.0
-    
-    # Audience size from follower count
-    audience_size = author.get('follower_count', 0)
-    if audience_size == 0:
-        audience_size = 1000  # Default minimum
-    
-    # Calculate baseline engagement
-    total_engagement = total_reactions + comments_count + reposts_count
-    baseline_engagement = total_engagement / max(audience_size, 1)
-    
-    # Calculate comment sentiment distribution (normalized -1 to 1)
-    if total_reactions > 0:
-        comment_sentiment_dist = (pct_positive - pct_negative) / 100
-        comment_sentiment_dist = np.clip(comment_sentiment_dist, -1, 1)
-    else:
-        comment_sentiment_dist = 0.0
-    
-    # Extract time window from timestamp
-    timestamp = posted_at.get('timestamp', 0)
-    if timestamp > 0:
-        # Convert timestamp (milliseconds) to datetime
-        post_datetime = datetime.fromtimestamp(timestamp / 1000)
-        hour = post_datetime.hour
-        weekday = post_datetime.weekday()  # 0 = Monday, 6 = Sunday
-        
-        if weekday >= 5:  # Saturday or Sunday
-            time_window = 'weekend'
-        elif hour < 12:
-            time_window = 'morning'
-        elif hour < 17:
-            time_window = 'afternoon'
-        else:
-            time_window = 'evening'
-    else:
-        time_window = 'afternoon'  # Default
-    
-    # Extract affiliation from source_company
-    affiliation = post.get('source_company', 'Unknown')
-    if affiliation and isinstance(affiliation, str):
-        affiliation = affiliation.capitalize()
-    else:
-        affiliation = 'Unknown'
-    
-    # Infer job_role from company name or use default
-    company_name = affiliation.lower()
-    if 'google' in company_name or 'microsoft' in company_name or 'apple' in company_name:
-        job_role = 'Software Engineer'
-    elif 'meta' in company_name or 'facebook' in company_name:
-        job_role = 'Product Manager'
-    else:
-        job_role = 'Product Manager'  # Default for company posts
-    
-    # Account age - use default since we don't have account creation date
-    account_age = 1825  # 5 years in days
-    
-    # Calculate engagement velocity
-    if timestamp > 0:
-        # Calculate post age in days
-        current_time = datetime.now().timestamp() * 1000
-        post_age_days = (current_time - timestamp) / (1000 * 60 * 60 * 24)
-        
-        # High engagement rate + recent post = high velocity
-        engagement_rate = baseline_engagement
-        if post_age_days < 1:  # Less than 1 day old
-            velocity_factor = 0.9
-        elif post_age_days < 7:  # Less than 1 week old
-            velocity_factor = 0.7
-        else:
-            velocity_factor = 0.5
-        
-        engagement_velocity = min(engagement_rate * 10 * velocity_factor, 1.0)
-        engagement_velocity = max(engagement_velocity, 0.0)
-    else:
-        engagement_velocity = 0.5  # Default
-    
-    return {
-        'post_text': post_text,
-        'job_role': job_role,
-        'affiliation': affiliation,
-        'account_age': account_age,
-        'audience_size': audience_size,
-        'baseline_engagement': baseline_engagement,
-        'time_window': time_window,
-        'pct_positive': pct_positive,
-        'pct_negative': pct_negative,
-        'comment_sentiment_dist': comment_sentiment_dist,
-        'engagement_velocity': engagement_velocity,
-    }
+    total_reactions = _numeric_column(df, 'stats.total_reactions')
+    positive_reactions = (
+        _numeric_column(df, 'stats.like')
+        + _numeric_column(df, 'stats.love')
+        + _numeric_column(df, 'stats.celebrate')
+        + _numeric_column(df, 'stats.support')
+    )
+    has_reactions = total_reactions > 0
+    safe_total = total_reactions.where(has_reactions)
+    pct_positive = (positive_reactions / safe_total * 100).fillna(0.0)
+    pct_negative = (_numeric_column(df, 'stats.insight') / safe_total * 100).fillna(0.0)
+
+    # Audience size from follower count (default minimum of 1000)
+    audience_size = _numeric_column(df, 'author.follower_count').replace(0, 1000).astype(np.int64)
+
+    # Baseline engagement and comment sentiment distribution (normalized -1 to 1)
+    total_engagement = total_reactions + _numeric_column(df, 'stats.comments') + _numeric_column(df, 'stats.reposts')
+    baseline_engagement = total_engagement / audience_size.clip(lower=1)
+    comment_sentiment_dist = np.where(
+        has_reactions, np.clip((pct_positive - pct_negative) / 100, -1, 1), 0.0
+    )
+
+    # Time window from the millisecond timestamp, in local time like datetime.fromtimestamp
+    timestamp = _numeric_column(df, 'posted_at.timestamp')
+    has_timestamp = timestamp > 0
+    posted = (
+        pd.to_datetime(timestamp.where(has_timestamp), unit='ms', utc=True)
+        .dt.tz_convert(tzlocal())
+    )
+    hour = posted.dt.hour
+    weekday = posted.dt.weekday
+    time_window = np.select(
+        [~has_timestamp, weekday >= 5, hour < 12, hour < 17],
+        ['afternoon', 'weekend', 'morning', 'afternoon'],
+        default='evening',
+    )
+
+    # Affiliation from source_company; job_role inferred from it
+    source = df['source_company'] if 'source_company' in df.columns else pd.Series(None, index=df.index, dtype=object)
+    is_named = source.map(lambda v: isinstance(v, str) and bool(v))
+    affiliation = source.where(is_named, 'Unknown').astype(str)
+    affiliation = affiliation.where(~is_named, affiliation.str.capitalize())
+    is_engineering = affiliation.str.lower().str.contains('google|microsoft|apple', regex=True)
+    job_role = np.where(is_engineering, 'Software Engineer', 'Product Manager')
+
+    # Engagement velocity: high engagement rate + recent post = high velocity
+    current_time = datetime.now().timestamp() * 1000
+    post_age_days = (current_time - timestamp) / (1000 * 60 * 60 * 24)
+    velocity_factor = np.select([post_age_days < 1, post_age_days < 7], [0.9, 0.7], default=0.5)
+    engagement_velocity = np.where(
+        has_timestamp, np.clip(baseline_engagement * 10 * velocity_factor, 0.0, 1.0), 0.5
+    )
+
+    return pd.DataFrame(
+        {
+            'post_text': df['text'],
+            'job_role': job_role,
+            'affiliation': affiliation,
+            'account_age': 1825,  # 5 years in days; no account creation date available
+            'audience_size': audience_size,
+            'baseline_engagement': baseline_engagement,
+            'time_window': time_window,
+            'pct_positive': pct_positive,
+            'pct_negative': pct_negative,
+            'comment_sentiment_dist': comment_sentiment_dist,
+            'engagement_velocity': engagement_velocity,
+        },
+        columns=OUTPUT_COLUMNS,
+    ).reset_index(drop=True)
 
 
 def convert_json_to_csv(json_file: str, output_file: str = None):
@@ -240,8 +258,7 @@ def convert_json_to_csv(json_file: str, output_file: str = None):
     print(f"Processing {os.path.basename(json_file)}...")
     
     # Load JSON
-    with open(json_file, 'r', encoding='utf-8') as f:
-        posts = json.load(f)
+    posts = _load_json(json_file)
     
     if not isinstance(posts, list):
         posts = [posts]
@@ -249,26 +266,26 @@ def convert_json_to_csv(json_file: str, output_file: str = None):
     print(f"  Loaded {len(posts)} posts")
     
     # Clean posts
-    cleaned_posts = clean_linkedin_post_data(posts)
-    print(f"  Cleaned: {len(cleaned_posts)} posts")
+    cleaned = clean_linkedin_post_data(posts)
+    print(f"  Cleaned: {len(cleaned)} posts")
     
     # Transform to rows
-    rows = []
-    for post in cleaned_posts:
-        row = transform_post_to_row(post)
-        if row:
-            rows.append(row)
-    
-    print(f"  Transformed: {len(rows)} rows")
+    df = transform_posts_to_frame(cleaned)
+    print(f"  Transformed: {len(df)} rows")
     
-    # Create DataFrame and save to CSV
-    df = pd.DataFrame(rows)
+    # Save to CSV
     df.to_csv(output_file, index=False, encoding='utf-8')
     print(f"  ✓ Saved to {os.path.basename(output_file)} ({len(df)} rows, {len(df.columns)} columns)")
     
     return df
 
 
+def _convert_file(json_file: str):
+    """Process-pool entry point: convert one file and report where it landed."""
+    df = convert_json_to_csv(json_file)
+    return json_file.replace('.json', '.csv'), len(df)
+
+
 def main():
     """Convert all JSON files in the data folder to CSV."""
     data_folder = 'data'
@@ -283,22 +300,36 @@ def main():
     
     print(f"Found {len(json_files)} JSON file(s) to convert...\n")
     
-    # Convert each file
-    all_dataframes = []
-    for json_file in sorted(json_files):
-        try:
-            df = convert_json_to_csv(json_file)
-            all_dataframes.append(df)
-            print()
-        except Exception as e:
-            print(f"  ✗ Error processing {os.path.basename(json_file)}: {e}\n")
-    
-    # Optionally create a combined CSV
-    if all_dataframes:
-        combined_df = pd.concat(all_dataframes, ignore_index=True)
-        combined_output = os.path.join(data_folder, 'all_posts_combined.csv')
-        combined_df.to_csv(combined_output, index=False, encoding='utf-8')
-        print(f"✓ Created combined CSV: {combined_output} ({len(combined_df)} total rows)")
+    # Files are independent, so convert them in parallel. Each worker writes
+    # its own CSV; the parent appends those files to the combined CSV in
+    # sorted order, so only file paths cross the process boundary
+    combined_output = os.path.join(data_folder, 'all_posts_combined.csv')
+    combined_rows = 0
+    combined_file = None
+    sorted_files = sorted(json_files)
+    max_workers = min(len(sorted_files), os.cpu_count() or 1)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_convert_file, json_file) for json_file in sorted_files]
+            for json_file, future in zip(sorted_files, futures):
+                try:
+                    csv_file, row_count = future.result()
+                    with open(csv_file, 'r', encoding='utf-8', newline='') as part:
+                        header = part.readline()
+                        if combined_file is None:
+                            combined_file = open(combined_output, 'w', encoding='utf-8', newline='')
+                            combined_file.write(header)
+                        shutil.copyfileobj(part, combined_file)
+                    combined_rows += row_count
+                except Exception as e:
+                    print(f"  ✗ Error processing {os.path.basename(json_file)}: {e}\n")
+    finally:
+        if combined_file is not None:
+            combined_file.close()
+    print()
+    
+    if combined_file is not None:
+        print(f"✓ Created combined CSV: {combined_output} ({combined_rows} total rows)")
     
     print("\n✓ Conversion complete!")
 
@@ -2,11 +2,15 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import logging
+import os
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from scipy.sparse import coo_matrix
 
 from .utils import (
     DEFAULT_SEED,
@@ -15,13 +19,18 @@ from .utils import (
     NARRATIVE_THRESHOLD,
     ROLE_BUCKETS,
     ROLE_MIN_COMMENTS,
-    canonicalize_url,
+    canonicalize_urls,
     drop_empty_text,
     ensure_columns,
 )
 
 logger = logging.getLogger(__name__)
 
+# Posts are unique per (company, post_url_clean) once _load_posts has run, and the
+# role/narrative targets are grouped on that same key, so the merges in
+# load_datasets cannot fan out. LYRA_STRICT_VALIDATE=1 re-checks this anyway.
+STRICT_VALIDATE = os.environ.get("LYRA_STRICT_VALIDATE", "0") == "1"
+
 
 POST_REQUIRED_COLUMNS = [
     "post_url",
@@ -60,6 +69,31 @@ COMMENT_REQUIRED_COLUMNS = [
 ]
 
 
+# Text columns are typed explicitly so Arrow does not infer e.g. posted_at as a
+# timestamp; numeric columns keep Arrow's inference.
+POST_STRING_COLUMNS = [
+    "post_url",
+    "post_text",
+    "posted_at",
+    "risk_level",
+    "risk_class",
+    "risk_reasons",
+    "risk_level_full",
+    "risk_class_full",
+    "risk_reasons_full",
+]
+
+COMMENT_STRING_COLUMNS = [
+    "post_url",
+    "comment_text",
+    "author_headline",
+    "role_bucket",
+    "sentiment",
+    "tone",
+    "narrative",
+]
+
+
 @dataclass
 class DatasetBundle:
     role_train: pd.DataFrame
@@ -82,14 +116,28 @@ def discover_companies(data_dir: Path) -> List[str]:
     return sorted(companies)
 
 
+def _read_csv(path: Path, string_columns: List[str]) -> pd.DataFrame:
+    """Parse a CSV with Arrow's multithreaded reader, matching pd.read_csv's NA handling."""
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(use_threads=True),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={col: pa.string() for col in string_columns},
+            strings_can_be_null=True,
+        ),
+    )
+    return table.to_pandas()
+
+
 def _load_posts(data_dir: Path, company: str) -> pd.DataFrame:
     path = data_dir / f"{company}_posts_training.csv"
     if not path.exists():
         raise FileNotFoundError(f"Posts file missing for {company}: {path}")
-    df = pd.read_csv(path)
+    df = _read_csv(path, POST_STRING_COLUMNS)
     ensure_columns(df, POST_REQUIRED_COLUMNS, f"{company}_posts_training.csv")
     df["company"] = company
-    df["post_url_clean"] = df["post_url"].apply(canonicalize_url)
+    df["post_url_clean"] = canonicalize_urls(df["post_url"])
     df = df[df["post_url_clean"] != ""]
     df = drop_empty_text(df, "post_text")
     _assert_unique_posts(df, company)
@@ -100,10 +148,10 @@ def _load_comments_full(data_dir: Path, company: str) -> pd.DataFrame:
     path = data_dir / f"{company}_comments_enriched_full.csv"
     if not path.exists():
         raise FileNotFoundError(f"comments_enriched_full file missing for {company}: {path}")
-    df = pd.read_csv(path)
+    df = _read_csv(path, COMMENT_STRING_COLUMNS)
     ensure_columns(df, COMMENT_REQUIRED_COLUMNS, f"{company}_comments_enriched_full.csv")
     df["company"] = company
-    df["post_url_clean"] = df["post_url"].apply(canonicalize_url)
+    df["post_url_clean"] = canonicalize_urls(df["post_url"])
     df = df[df["post_url_clean"] != ""]
     return df
 
@@ -117,18 +165,35 @@ def _assert_unique_posts(df: pd.DataFrame, company: str) -> None:
         )
 
 
+def _post_shares(comments_df: pd.DataFrame, value_col: str, columns: List[str]) -> pd.DataFrame:
+    """
+    Per-post share of each value of `value_col`, normalized over every observed
+    value and returned for `columns` only (absent ones are 0). Counts are built
+    with a sparse COO matrix from factorized codes rather than groupby/unstack.
+    """
+    keys = comments_df.groupby(["company", "post_url_clean"], sort=True)
+    index = keys.size().index
+    rows = keys.ngroup().to_numpy()
+    codes, values = pd.factorize(comments_df[value_col], sort=True)
+    valid = (rows >= 0) & (codes >= 0)
+    counts = coo_matrix(
+        (np.ones(int(valid.sum())), (rows[valid], codes[valid])),
+        shape=(len(index), len(values)),
+    ).toarray()
+    totals = counts.sum(axis=1, keepdims=True)
+    shares = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+    positions = {value: pos for pos, value in enumerate(values)}
+    out = np.zeros((len(index), len(columns)))
+    for col_idx, column in enumerate(columns):
+        if column in positions:
+            out[:, col_idx] = shares[:, positions[column]]
+    return pd.DataFrame(out, index=index, columns=columns)
+
+
 def _compute_role_distribution(comments_df: pd.DataFrame) -> pd.DataFrame:
-    working = comments_df.copy()
-    working["role_bucket"] = working["role_bucket"].fillna("Other")
-    working.loc[~working["role_bucket"].isin(ROLE_BUCKETS), "role_bucket"] = "Other"
-    role_counts = (
-        working.groupby(["company", "post_url_clean", "role_bucket"])
-        .size()
-        .unstack(fill_value=0)
-        .reindex(columns=ROLE_BUCKETS, fill_value=0)
-    )
-    totals = role_counts.sum(axis=1).replace(0, np.nan)
-    role_pct = role_counts.div(totals, axis=0).fillna(0)
+    roles = comments_df["role_bucket"]
+    working = comments_df.assign(role_bucket=roles.where(roles.isin(ROLE_BUCKETS), "Other"))
+    role_pct = _post_shares(working, "role_bucket", ROLE_BUCKETS).astype(np.float32)
     role_pct.reset_index(inplace=True)
     return role_pct
 
@@ -142,39 +207,30 @@ def _compute_narrative_flags(
     narrative_df has columns company, post_url_clean, plus each label.
     """
     if comments_df is not None and not comments_df.empty:
-        working = comments_df.copy()
-        working = working.dropna(subset=["post_url_clean"])
-        working["narrative"] = working["narrative"].fillna("")
-        counts = (
-            working.groupby(["company", "post_url_clean", "narrative"])
-            .size()
-            .unstack(fill_value=0)
-        )
-        counts = counts.reindex(columns=sorted(set(counts.columns) | set(NARRATIVE_LABELS)), fill_value=0)
-        denom = counts.sum(axis=1).replace(0, np.nan)
-        shares = counts.div(denom, axis=0).fillna(0)
-        flags = (shares[NARRATIVE_LABELS] >= NARRATIVE_THRESHOLD).astype(int)
+        working = comments_df.dropna(subset=["post_url_clean"])
+        working = working.assign(narrative=working["narrative"].fillna(""))
+        shares = _post_shares(working, "narrative", NARRATIVE_LABELS)
+        flags = (shares >= NARRATIVE_THRESHOLD).astype(np.int8)
         flags.reset_index(inplace=True)
         return flags, True
 
     # Fallback using post-level aggregates.
-    fallback = posts_df.copy()
-    fallback = fallback[["company", "post_url_clean", "pct_toxic_burnout"]].copy()
+    fallback = posts_df[["company", "post_url_clean", "pct_toxic_burnout"]].copy()
     fallback.rename(columns={"pct_toxic_burnout": "pct_toxic_burnout_proxy"}, inplace=True)
-    fallback["toxic_culture"] = (fallback["pct_toxic_burnout_proxy"] >= NARRATIVE_THRESHOLD).astype(int)
-    fallback["burnout"] = (fallback["pct_toxic_burnout_proxy"] >= NARRATIVE_THRESHOLD).astype(int)
-    fallback["elitism"] = 0
-    fallback["credibility_overclaim"] = 0
-    fallback["culture_misalignment"] = 0
+    fallback["toxic_culture"] = (fallback["pct_toxic_burnout_proxy"] >= NARRATIVE_THRESHOLD).astype(np.int8)
+    fallback["burnout"] = (fallback["pct_toxic_burnout_proxy"] >= NARRATIVE_THRESHOLD).astype(np.int8)
+    fallback["elitism"] = np.int8(0)
+    fallback["credibility_overclaim"] = np.int8(0)
+    fallback["culture_misalignment"] = np.int8(0)
     return fallback[
         ["company", "post_url_clean", "toxic_culture", "burnout", "elitism", "credibility_overclaim", "culture_misalignment"]
     ], False
 
 
 def _normalize_risk_class(series: pd.Series) -> pd.Series:
-    cleaned = series.fillna("").astype(str).str.strip()
-    cleaned = cleaned.replace("", np.nan)
-    return cleaned.str.title()
+    """Trim and title-case risk labels (blank -> NaN), normalizing each distinct raw value once."""
+    lookup = {raw: str(raw).strip().title() or np.nan for raw in series.dropna().unique()}
+    return series.map(lookup)
 
 
 def load_datasets(
@@ -203,36 +259,43 @@ def load_datasets(
     if not used_comments:
         logger.warning("Narrative targets falling back to pct_toxic_burnout proxy; comment narratives missing.")
 
-    merged = posts_df.merge(role_pct, on=["company", "post_url_clean"], how="left", validate="one_to_one")
-    merged[ROLE_BUCKETS] = merged[ROLE_BUCKETS].fillna(0.0)
+    merge_validate = "one_to_one" if STRICT_VALIDATE else None
+    merged = posts_df.merge(role_pct, on=["company", "post_url_clean"], how="left", validate=merge_validate)
+    # Left-merge NaNs upcast the targets; restore the compact dtypes after filling.
+    merged[ROLE_BUCKETS] = merged[ROLE_BUCKETS].fillna(0.0).astype(np.float32)
 
     merged = merged.merge(
         narrative_flags,
         on=["company", "post_url_clean"],
         how="left",
-        validate="one_to_one",
+        validate=merge_validate,
     )
-    merged[NARRATIVE_LABELS] = merged[NARRATIVE_LABELS].fillna(0).astype(int)
+    merged[NARRATIVE_LABELS] = merged[NARRATIVE_LABELS].fillna(0).astype(np.int8)
 
-    merged["risk_class_target"] = _normalize_risk_class(merged["risk_class_full"]).fillna(
-        _normalize_risk_class(merged["risk_class"])
+    merged["risk_class_target"] = (
+        _normalize_risk_class(merged["risk_class_full"])
+        .fillna(_normalize_risk_class(merged["risk_class"]))
+        .astype("category")
     )
 
     merged = merged.dropna(subset=["risk_class_target"])
 
-    # Final uniqueness check after merges.
-    _assert_unique_posts(merged, "all_companies")
+    if STRICT_VALIDATE:
+        # Final uniqueness check after merges.
+        _assert_unique_posts(merged, "all_companies")
 
-    role_df = merged[merged["total_comments"] >= ROLE_MIN_COMMENTS].copy()
-    narrative_df = merged[merged["total_comments"] >= NARRATIVE_MIN_COMMENTS].copy()
-    risk_df = merged.copy()
+    # Boolean-mask selections already return new frames, and reset_index below
+    # materializes each split once, so no intermediate copies are taken.
+    role_df = merged[merged["total_comments"] >= ROLE_MIN_COMMENTS]
+    narrative_df = merged[merged["total_comments"] >= NARRATIVE_MIN_COMMENTS]
+    risk_df = merged
 
-    role_train = role_df[role_df["company"] != holdout_company].copy()
-    role_test = role_df[role_df["company"] == holdout_company].copy()
-    narrative_train = narrative_df[narrative_df["company"] != holdout_company].copy()
-    narrative_test = narrative_df[narrative_df["company"] == holdout_company].copy()
-    risk_train = risk_df[risk_df["company"] != holdout_company].copy()
-    risk_test = risk_df[risk_df["company"] == holdout_company].copy()
+    role_train = role_df[role_df["company"] != holdout_company]
+    role_test = role_df[role_df["company"] == holdout_company]
+    narrative_train = narrative_df[narrative_df["company"] != holdout_company]
+    narrative_test = narrative_df[narrative_df["company"] == holdout_company]
+    risk_train = risk_df[risk_df["company"] != holdout_company]
+    risk_test = risk_df[risk_df["company"] == holdout_company]
 
     split_manifest = {
         "role": _manifest_counts(role_df, holdout_company),
@@ -240,8 +303,7 @@ def load_datasets(
         "risk": _manifest_counts(risk_df, holdout_company),
     }
 
-    retriever_train = merged[merged["company"] != holdout_company].copy()
-    retriever_train = retriever_train.reset_index(drop=True)
+    retriever_train = merged[merged["company"] != holdout_company].reset_index(drop=True)
 
     return DatasetBundle(
         role_train=role_train.reset_index(drop=True),
@@ -3,15 +3,19 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
-import matplotlib.pyplot as plt
+import matplotlib
+
+# Plots are only written to files; the non-interactive backend avoids GUI
+# backend probing at import.
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
 import numpy as np
+from joblib import Parallel, delayed
 from sklearn.metrics import (
     accuracy_score,
-    average_precision_score,
     confusion_matrix,
     f1_score,
     mean_absolute_error,
-    precision_recall_curve,
     r2_score,
 )
 from sklearn.model_selection import GroupKFold
@@ -20,6 +24,8 @@ from .utils import NARRATIVE_LABELS, ROLE_BUCKETS
 
 
 RISK_LABELS = ["Helpful", "Harmless", "Harmful"]
+# Worker processes for GroupKFold CV; each fold is fitted independently.
+CV_N_JOBS = -1
 
 
 def evaluate_role_model(model, df, plots_dir: Path) -> Tuple[Dict[str, Any], Dict[str, str]]:
@@ -27,10 +33,8 @@ def evaluate_role_model(model, df, plots_dir: Path) -> Tuple[Dict[str, Any], Dic
     y_true = df[ROLE_BUCKETS].to_numpy()
     y_pred = model.predict(X_test)
 
-    r2_scores = {bucket: r2_score(y_true[:, idx], y_pred[:, idx]) for idx, bucket in enumerate(ROLE_BUCKETS)}
-    mae_scores = {
-        bucket: mean_absolute_error(y_true[:, idx], y_pred[:, idx]) for idx, bucket in enumerate(ROLE_BUCKETS)
-    }
+    r2_scores = dict(zip(ROLE_BUCKETS, r2_score(y_true, y_pred, multioutput="raw_values").tolist()))
+    mae_scores = dict(zip(ROLE_BUCKETS, mean_absolute_error(y_true, y_pred, multioutput="raw_values").tolist()))
     metrics = {
         "r2": {**r2_scores, "macro": float(np.mean(list(r2_scores.values())))},
         "mae": {**mae_scores, "macro": float(np.mean(list(mae_scores.values())))},
@@ -59,12 +63,8 @@ def evaluate_narrative_model(
 
     micro_f1 = f1_score(y_true, y_pred, average="micro", zero_division=0)
     macro_f1 = f1_score(y_true, y_pred, average="macro", zero_division=0)
-    pr_auc = {}
-    for idx, label in enumerate(NARRATIVE_LABELS):
-        if y_true[:, idx].sum() == 0:
-            pr_auc[label] = 0.0
-        else:
-            pr_auc[label] = float(average_precision_score(y_true[:, idx], y_prob[:, idx]))
+    ap, curves = _multilabel_pr(y_true, y_prob)
+    pr_auc = {label: float(ap[idx]) for idx, label in enumerate(NARRATIVE_LABELS)}
     metrics = {
         "f1_micro": float(micro_f1),
         "f1_macro": float(macro_f1),
@@ -72,7 +72,7 @@ def evaluate_narrative_model(
     }
 
     plots_dir.mkdir(parents=True, exist_ok=True)
-    pr_path = _plot_pr_curves(y_true, y_prob, plots_dir / "narrative_pr_curves.png")
+    pr_path = _plot_pr_curves(curves, plots_dir / "narrative_pr_curves.png")
     plot_paths = {"narrative_pr_curves": str(pr_path)}
 
     top_terms = extract_top_ngrams(model, NARRATIVE_LABELS, top_k=top_k)
@@ -81,9 +81,11 @@ def evaluate_narrative_model(
 
 def evaluate_risk_model(model, df, plots_dir: Path) -> Tuple[Dict[str, Any], Dict[str, str]]:
     X_test = df["post_text"]
-    y_true = df["risk_class_target"].astype(str).str.title()
-    y_pred = model.predict(X_test)
+    y_true = df["risk_class_target"].to_numpy()
+    # One transform + predict_proba pass; CalibratedClassifierCV.predict is the
+    # argmax of these same probabilities.
     y_prob = np.asarray(model.predict_proba(X_test))
+    y_pred = model.classes_[np.argmax(y_prob, axis=1)]
 
     acc = accuracy_score(y_true, y_pred)
     macro_f1 = f1_score(y_true, y_pred, average="macro")
@@ -105,13 +107,25 @@ def extract_top_ngrams(model, labels: List[str], top_k: int = 15) -> Dict[str, L
     clf = model.named_steps["clf"]
     feature_names = np.asarray(tfidf.get_feature_names_out())
     results: Dict[str, List[Dict[str, float]]] = {}
+    fitted = []
     for label, estimator in zip(labels, clf.estimators_):
-        if not hasattr(estimator, "coef_"):
-            results[label] = []
-            continue
-        coefs = estimator.coef_.ravel()
-        top_idx = np.argsort(coefs)[::-1][:top_k]
-        results[label] = [{"term": feature_names[i], "weight": float(coefs[i])} for i in top_idx]
+        results[label] = []
+        if hasattr(estimator, "coef_"):
+            fitted.append((label, estimator.coef_.ravel()))
+    if not fitted:
+        return results
+
+    # Partial-select the top k per label across all labels at once, then sort
+    # only those k instead of the whole vocabulary.
+    coefs = np.vstack([c for _, c in fitted])
+    k = min(top_k, coefs.shape[1])
+    if k <= 0:
+        return results
+    top_idx = np.argpartition(-coefs, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(coefs, top_idx, axis=1), axis=1, kind="stable")
+    top_idx = np.take_along_axis(top_idx, order, axis=1)
+    for row, (label, _) in enumerate(fitted):
+        results[label] = [{"term": feature_names[i], "weight": float(coefs[row, i])} for i in top_idx[row]]
     return results
 
 
@@ -159,13 +173,54 @@ def _plot_role_scatter(y_true: np.ndarray, y_pred: np.ndarray, path: Path) -> Pa
     return path
 
 
-def _plot_pr_curves(y_true: np.ndarray, y_prob: np.ndarray, path: Path) -> Path:
+def _multilabel_pr(
+    y_true: np.ndarray, y_prob: np.ndarray
+) -> Tuple[np.ndarray, List[Tuple[np.ndarray, np.ndarray]]]:
+    """
+    Average precision and (precision, recall) curves for every label column from
+    one sort and one cumulative sum over the whole matrix. Tied scores form one
+    threshold, as in sklearn's average_precision_score / precision_recall_curve.
+    Labels without positives get AP 0 and a flat placeholder curve.
+    """
+    y_true = np.asarray(y_true, dtype=float)
+    y_prob = np.asarray(y_prob, dtype=float)
+    n_rows = y_true.shape[0]
+    order = np.argsort(-y_prob, axis=0, kind="stable")
+    scores = np.take_along_axis(y_prob, order, axis=0)
+    hits = np.take_along_axis(y_true, order, axis=0)
+
+    tp = np.cumsum(hits, axis=0)
+    precision = tp / np.arange(1, n_rows + 1)[:, None]
+    positives = tp[-1] if n_rows else np.zeros(y_true.shape[1])
+    recall = np.divide(tp, positives, out=np.zeros_like(tp), where=positives > 0)
+
+    # A threshold sits at the last row of each run of tied scores; every
+    # positive in the run is credited with the precision at that row.
+    is_last = np.ones_like(scores, dtype=bool)
+    is_last[:-1] = scores[:-1] != scores[1:]
+    last_row = np.where(is_last, np.arange(n_rows)[:, None], n_rows)
+    group_end = np.minimum.accumulate(last_row[::-1], axis=0)[::-1]
+    group_precision = np.take_along_axis(precision, group_end, axis=0)
+    ap = np.divide(
+        (hits * group_precision).sum(axis=0),
+        positives,
+        out=np.zeros(y_true.shape[1]),
+        where=positives > 0,
+    )
+
+    curves: List[Tuple[np.ndarray, np.ndarray]] = []
+    for idx in range(y_true.shape[1]):
+        if positives[idx] == 0:
+            curves.append((np.array([0.0, 0.0]), np.array([0.0, 1.0])))
+            continue
+        rows = np.flatnonzero(is_last[:, idx])
+        curves.append((np.r_[1.0, precision[rows, idx]], np.r_[0.0, recall[rows, idx]]))
+    return ap, curves
+
+
+def _plot_pr_curves(curves: List[Tuple[np.ndarray, np.ndarray]], path: Path) -> Path:
     fig, ax = plt.subplots(figsize=(10, 6))
-    for idx, label in enumerate(NARRATIVE_LABELS):
-        if y_true[:, idx].sum() == 0:
-            precision, recall = [0.0, 0.0], [0.0, 1.0]
-        else:
-            precision, recall, _ = precision_recall_curve(y_true[:, idx], y_prob[:, idx])
+    for label, (precision, recall) in zip(NARRATIVE_LABELS, curves):
         ax.plot(recall, precision, label=label)
     ax.set_xlabel("Recall")
     ax.set_ylabel("Precision")
@@ -188,9 +243,8 @@ def _plot_confusion(y_true, y_pred, path: Path) -> Path:
     ax.set_ylabel("True label")
     ax.set_xlabel("Predicted label")
     ax.set_title("Risk class confusion matrix (normalized)")
-    for i in range(cm.shape[0]):
-        for j in range(cm.shape[1]):
-            ax.text(j, i, f"{cm[i, j]:.2f}", ha="center", va="center", color="white" if cm[i, j] > 0.5 else "black")
+    for (i, j), value in np.ndenumerate(cm):
+        ax.text(j, i, f"{value:.2f}", ha="center", va="center", color="white" if value > 0.5 else "black")
     fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
     fig.tight_layout()
     fig.savefig(path, dpi=150)
@@ -199,59 +253,61 @@ def _plot_confusion(y_true, y_pred, path: Path) -> Path:
 
 
 def run_group_cv_role(model_builder, df, n_splits: int = 5) -> Dict[str, float]:
-    groups = df["company"]
-    splits = _effective_splits(groups, n_splits)
-    if splits < 2:
-        return {}
-    cv = GroupKFold(n_splits=splits)
-    maes = []
-    for train_idx, val_idx in cv.split(df, groups=groups):
-        model = model_builder()
-        X_train, X_val = df.iloc[train_idx]["post_text"], df.iloc[val_idx]["post_text"]
-        y_train = df.iloc[train_idx][ROLE_BUCKETS]
-        y_val = df.iloc[val_idx][ROLE_BUCKETS].to_numpy()
-        model.fit(X_train, y_train)
-        preds = model.predict(X_val)
-        mae_scores = [mean_absolute_error(y_val[:, i], preds[:, i]) for i in range(len(ROLE_BUCKETS))]
-        maes.append(float(np.mean(mae_scores)))
+    maes = _run_group_folds(_role_fold, model_builder, df, df[ROLE_BUCKETS].to_numpy(), n_splits)
     return {"mae_macro_cv": float(np.mean(maes))} if maes else {}
 
 
 def run_group_cv_narrative(model_builder, df, threshold: float, n_splits: int = 5) -> Dict[str, float]:
-    groups = df["company"]
-    splits = _effective_splits(groups, n_splits)
-    if splits < 2:
-        return {}
-    cv = GroupKFold(n_splits=splits)
-    macro_f1_scores = []
-    for train_idx, val_idx in cv.split(df, groups=groups):
-        model = model_builder()
-        X_train, X_val = df.iloc[train_idx]["post_text"], df.iloc[val_idx]["post_text"]
-        y_train = df.iloc[train_idx][NARRATIVE_LABELS]
-        y_val = df.iloc[val_idx][NARRATIVE_LABELS].to_numpy()
-        model.fit(X_train, y_train)
-        probs = np.asarray(model.predict_proba(X_val))
-        preds = (probs >= threshold).astype(int)
-        macro_f1_scores.append(float(f1_score(y_val, preds, average="macro", zero_division=0)))
+    macro_f1_scores = _run_group_folds(
+        _narrative_fold, model_builder, df, df[NARRATIVE_LABELS].to_numpy(), n_splits, threshold=threshold
+    )
     return {"f1_macro_cv": float(np.mean(macro_f1_scores))} if macro_f1_scores else {}
 
 
 def run_group_cv_risk(model_builder, df, n_splits: int = 5) -> Dict[str, float]:
-    groups = df["company"]
+    labels = df["risk_class_target"].to_numpy()
+    macro_f1_scores = _run_group_folds(_risk_fold, model_builder, df, labels, n_splits)
+    return {"f1_macro_cv": float(np.mean(macro_f1_scores))} if macro_f1_scores else {}
+
+
+def _run_group_folds(fold_fn, model_builder, df, y: np.ndarray, n_splits: int, **kwargs: Any) -> List[float]:
+    """
+    Fit and score every GroupKFold fold in parallel worker processes; folds are
+    independent, so the scores come back in split order as before. Texts and
+    targets are pulled out of the frame once and each fold indexes the arrays.
+    """
+    groups = df["company"].to_numpy()
     splits = _effective_splits(groups, n_splits)
     if splits < 2:
-        return {}
+        return []
+    texts = df["post_text"].to_numpy()
     cv = GroupKFold(n_splits=splits)
-    macro_f1_scores = []
-    for train_idx, val_idx in cv.split(df, groups=groups):
-        model = model_builder()
-        X_train, X_val = df.iloc[train_idx]["post_text"], df.iloc[val_idx]["post_text"]
-        y_train = df.iloc[train_idx]["risk_class_target"].astype(str).str.title()
-        y_val = df.iloc[val_idx]["risk_class_target"].astype(str).str.title()
-        model.fit(X_train, y_train)
-        preds = model.predict(X_val)
-        macro_f1_scores.append(float(f1_score(y_val, preds, average="macro")))
-    return {"f1_macro_cv": float(np.mean(macro_f1_scores))} if macro_f1_scores else {}
+    return Parallel(n_jobs=CV_N_JOBS)(
+        delayed(fold_fn)(model_builder, texts, y, train_idx, val_idx, **kwargs)
+        for train_idx, val_idx in cv.split(texts, groups=groups)
+    )
+
+
+def _role_fold(model_builder, texts, y, train_idx, val_idx) -> float:
+    model = model_builder()
+    model.fit(texts[train_idx], y[train_idx])
+    preds = model.predict(texts[val_idx])
+    return float(np.mean(mean_absolute_error(y[val_idx], preds, multioutput="raw_values")))
+
+
+def _narrative_fold(model_builder, texts, y, train_idx, val_idx, threshold: float) -> float:
+    model = model_builder()
+    model.fit(texts[train_idx], y[train_idx])
+    probs = np.asarray(model.predict_proba(texts[val_idx]))
+    preds = (probs >= threshold).astype(int)
+    return float(f1_score(y[val_idx], preds, average="macro", zero_division=0))
+
+
+def _risk_fold(model_builder, texts, y, train_idx, val_idx) -> float:
+    model = model_builder()
+    model.fit(texts[train_idx], y[train_idx])
+    preds = model.predict(texts[val_idx])
+    return float(f1_score(y[val_idx], preds, average="macro"))
 
 
 def _effective_splits(groups, desired: int) -> int:
@@ -4,7 +4,8 @@ from typing import Any, Dict, Optional
 
 import numpy as np
 from sklearn.calibration import CalibratedClassifierCV
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.frozen import FrozenEstimator
 from sklearn.linear_model import LogisticRegression, RidgeCV
 from sklearn.multioutput import MultiOutputRegressor
 from sklearn.multiclass import OneVsRestClassifier
@@ -32,26 +33,44 @@ def build_tfidf_vectorizer(
     )
 
 
+def _tfidf_step(
+    tfidf_params: Optional[Dict[str, Any]],
+    vectorizer: Optional[TfidfVectorizer],
+):
+    """
+    Pipeline TF-IDF step: a fresh vectorizer, or an already-fitted shared one
+    frozen so that fitting the pipeline only transforms with it.
+    """
+    if vectorizer is not None:
+        return FrozenEstimator(vectorizer)
+    return build_tfidf_vectorizer(**(tfidf_params or {}))
+
+
 class RoleCompositionModel(BaseEstimator):
     """
     Wrapper combining TF-IDF with multi-output Ridge and row-wise softmax
-    to produce valid role distributions.
+    to produce valid role distributions. A pre-fitted `vectorizer` is used
+    as-is instead of fitting a new one.
     """
 
     def __init__(
         self,
         tfidf_params: Optional[Dict[str, Any]] = None,
         alpha_grid: Optional[np.ndarray] = None,
+        vectorizer: Optional[TfidfVectorizer] = None,
+        memory: Optional[str] = None,
     ) -> None:
         self.tfidf_params = tfidf_params or {}
         self.alpha_grid = alpha_grid
+        self.vectorizer = vectorizer
+        self.memory = memory
         self.pipeline: Optional[Pipeline] = None
 
     def fit(self, X, y):
         alphas = self.alpha_grid if self.alpha_grid is not None else np.logspace(-3, 3, 13)
-        tfidf = build_tfidf_vectorizer(**self.tfidf_params)
+        tfidf = _tfidf_step(self.tfidf_params, self.vectorizer)
         ridge = MultiOutputRegressor(RidgeCV(alphas=alphas))
-        self.pipeline = Pipeline([("tfidf", tfidf), ("model", ridge)])
+        self.pipeline = Pipeline([("tfidf", tfidf), ("model", ridge)], memory=self.memory)
         self.pipeline.fit(X, y)
         return self
 
@@ -72,42 +91,76 @@ class RoleCompositionModel(BaseEstimator):
         return self.pipeline.named_steps["tfidf"]
 
 
-def build_role_model(tfidf_params: Optional[Dict[str, Any]] = None) -> RoleCompositionModel:
-    return RoleCompositionModel(tfidf_params=tfidf_params)
+def build_role_model(
+    tfidf_params: Optional[Dict[str, Any]] = None,
+    vectorizer: Optional[TfidfVectorizer] = None,
+    memory: Optional[str] = None,
+) -> RoleCompositionModel:
+    return RoleCompositionModel(tfidf_params=tfidf_params, vectorizer=vectorizer, memory=memory)
 
 
 def build_narrative_model(
     tfidf_params: Optional[Dict[str, Any]] = None,
     random_state: int = 42,
+    vectorizer: Optional[TfidfVectorizer] = None,
+    memory: Optional[str] = None,
+    max_iter: int = 4000,
 ) -> Pipeline:
-    tfidf = build_tfidf_vectorizer(**(tfidf_params or {}))
+    tfidf = _tfidf_step(tfidf_params, vectorizer)
     clf = OneVsRestClassifier(
         LogisticRegression(
-            max_iter=4000,
+            max_iter=max_iter,
             class_weight="balanced",
             solver="liblinear",
             random_state=random_state,
-        )
+        ),
+        # liblinear is single-threaded; fit the per-label problems in parallel.
+        n_jobs=-1,
     )
-    return Pipeline([("tfidf", tfidf), ("clf", clf)])
+    return Pipeline([("tfidf", tfidf), ("clf", clf)], memory=memory)
 
 
 def build_risk_model(
     tfidf_params: Optional[Dict[str, Any]] = None,
     random_state: int = 42,
     cv_folds: int = 3,
+    vectorizer: Optional[TfidfVectorizer] = None,
+    memory: Optional[str] = None,
+    max_iter: int = 4000,
 ) -> Pipeline:
-    tfidf = build_tfidf_vectorizer(**(tfidf_params or {}))
+    tfidf = _tfidf_step(tfidf_params, vectorizer)
     base_logreg = LogisticRegression(
-        max_iter=4000,
+        max_iter=max_iter,
         class_weight="balanced",
         solver="liblinear",
         multi_class="ovr",
         random_state=random_state,
     )
-    calibrated = CalibratedClassifierCV(estimator=base_logreg, cv=cv_folds, method="sigmoid")
-    return Pipeline([("tfidf", tfidf), ("clf", calibrated)])
+    calibrated = CalibratedClassifierCV(estimator=base_logreg, cv=cv_folds, method="sigmoid", n_jobs=-1)
+    return Pipeline([("tfidf", tfidf), ("clf", calibrated)], memory=memory)
 
 
 def build_shared_tfidf(tfidf_params: Optional[Dict[str, Any]] = None) -> TfidfVectorizer:
-    return build_tfidf_vectorizer(**(tfidf_params or {}))
+    # float32 halves the saved retriever matrix and the bytes each query's
+    # sparse dot product reads; TF-IDF weights do not need double precision.
+    params = {"dtype": np.float32, **(tfidf_params or {})}
+    return build_tfidf_vectorizer(**params)
+
+
+def build_hashing_tfidf(tfidf_params: Optional[Dict[str, Any]] = None, n_features: int = 2**18) -> Pipeline:
+    """
+    Vocabulary-free TF-IDF: hashed n-gram counts reweighted by IDF. Fitting is a
+    single pass with no vocabulary dict, and only the IDF vector is stored.
+    Vocabulary pruning params (min_df, max_df, max_features) do not apply.
+    """
+    params = tfidf_params or {}
+    hasher = HashingVectorizer(
+        n_features=n_features,
+        ngram_range=params.get("ngram_range", (1, 2)),
+        strip_accents="unicode",
+        lowercase=True,
+        alternate_sign=False,
+        norm=None,
+        dtype=np.float32,
+    )
+    return Pipeline([("hash", hasher), ("idf", TfidfTransformer())])
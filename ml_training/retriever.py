@@ -1,22 +1,25 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 import joblib
-import numpy as np
 import pandas as pd
-from scipy.sparse import save_npz, load_npz
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy.sparse import save_npz, load_npz, spmatrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
 
-from .models import build_shared_tfidf
-from .utils import safe_mkdir
+from .models import build_hashing_tfidf
+from .utils import safe_mkdir, top_k_indices
 
 
 RETRIEVER_FILES = {
     "vectorizer": "shared_tfidf.joblib",
     "matrix": "train_tfidf_matrix.npz",
-    "index": "train_post_index.csv",
+    "index": "train_post_index.parquet",
+    # Written by older training runs; read when no Parquet index exists.
+    "index_csv": "train_post_index.csv",
 }
 
 
@@ -24,11 +27,23 @@ def build_retriever_artifacts(
     train_df: pd.DataFrame,
     output_dir: Path,
     tfidf_params: Dict[str, Any],
+    vectorizer: Optional[TfidfVectorizer] = None,
+    matrix: Optional[spmatrix] = None,
 ) -> None:
+    """
+    Save the retriever vectorizer, TF-IDF matrix and post index. Pass the shared
+    `vectorizer` and its `matrix` for `train_df` to skip refitting them here;
+    without one, a hashing TF-IDF is fitted so no vocabulary has to be built.
+    """
     models_dir = output_dir / "models"
     safe_mkdir(models_dir)
-    vectorizer = build_shared_tfidf(tfidf_params)
-    matrix = vectorizer.fit_transform(train_df["post_text"])
+    if vectorizer is None:
+        vectorizer = build_hashing_tfidf(tfidf_params)
+        matrix = vectorizer.fit_transform(train_df["post_text"])
+    elif matrix is None:
+        matrix = vectorizer.transform(train_df["post_text"])
+    # Unit-length rows let queries score by a plain sparse dot product.
+    matrix = normalize(matrix, norm="l2")
 
     joblib.dump(vectorizer, models_dir / RETRIEVER_FILES["vectorizer"])
     save_npz(models_dir / RETRIEVER_FILES["matrix"], matrix)
@@ -53,7 +68,29 @@ def build_retriever_artifacts(
     index_cols = ["post_url_clean", "company", "posted_at", "risk_class_target", "total_comments"] + percentage_cols
     index_df = train_df[index_cols].copy()
     index_df = index_df.rename(columns={"post_url_clean": "post_url", "risk_class_target": "risk_class"})
-    index_df.to_csv(models_dir / RETRIEVER_FILES["index"], index=False)
+    index_df.to_parquet(models_dir / RETRIEVER_FILES["index"], engine="pyarrow", index=False)
+
+
+@lru_cache(maxsize=4)
+def _load_retriever(model_dir: str) -> Tuple[TfidfVectorizer, spmatrix, pd.DataFrame]:
+    """
+    Load the retriever artifacts once per model directory; later queries reuse
+    them. Call `_load_retriever.cache_clear()` after rebuilding the artifacts.
+    """
+    models_path = Path(model_dir)
+    vectorizer = joblib.load(models_path / RETRIEVER_FILES["vectorizer"])
+    # Normalize again on load so artifacts saved before rows were normalized
+    # still give cosine scores.
+    matrix = normalize(load_npz(models_path / RETRIEVER_FILES["matrix"]), norm="l2").tocsr()
+    return vectorizer, matrix, load_index(models_path)
+
+
+def load_index(models_path: Path) -> pd.DataFrame:
+    """Read the retriever post index, preferring Parquet over the legacy CSV."""
+    parquet_path = models_path / RETRIEVER_FILES["index"]
+    if parquet_path.exists():
+        return pd.read_parquet(parquet_path, engine="pyarrow")
+    return pd.read_csv(models_path / RETRIEVER_FILES["index_csv"])
 
 
 def get_similar_posts(draft_text: str, k: int = 3, model_dir: str = "output/models") -> List[Dict[str, Any]]:
@@ -63,18 +100,13 @@ def get_similar_posts(draft_text: str, k: int = 3, model_dir: str = "output/mode
     if not draft_text or not draft_text.strip():
         raise ValueError("draft_text cannot be empty.")
 
-    models_path = Path(model_dir)
-    vectorizer = joblib.load(models_path / RETRIEVER_FILES["vectorizer"])
-    matrix = load_npz(models_path / RETRIEVER_FILES["matrix"])
-    index_df = pd.read_csv(models_path / RETRIEVER_FILES["index"])
-
-    query_vec = vectorizer.transform([draft_text])
-    similarities = cosine_similarity(query_vec, matrix).ravel()
-    top_idx = np.argsort(similarities)[::-1][:k]
-
-    results: List[Dict[str, Any]] = []
-    for idx in top_idx:
-        record = index_df.iloc[idx].to_dict()
-        record["similarity"] = float(similarities[idx])
-        results.append(record)
+    vectorizer, matrix, index_df = _load_retriever(str(Path(model_dir).resolve()))
+
+    query_vec = normalize(vectorizer.transform([draft_text]), norm="l2")
+    similarities = (matrix @ query_vec.T).toarray().ravel()
+    top_idx = top_k_indices(similarities, k)
+
+    results: List[Dict[str, Any]] = index_df.iloc[top_idx].to_dict(orient="records")
+    for record, similarity in zip(results, similarities[top_idx].tolist()):
+        record["similarity"] = similarity
     return results
@@ -8,9 +8,10 @@ import joblib
 
 from . import data_loader
 from . import eval as eval_utils
-from .models import build_narrative_model, build_risk_model, build_role_model
+from .models import build_narrative_model, build_risk_model, build_role_model, build_shared_tfidf
 from .retriever import build_retriever_artifacts
 from .utils import (
+    CV_MAX_ITER,
     DEFAULT_SEED,
     NARRATIVE_LABELS,
     NARRATIVE_THRESHOLD,
@@ -40,6 +41,12 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Skip GroupKFold sanity checks to save time.",
     )
+    parser.add_argument(
+        "--cache_dir",
+        type=str,
+        default=None,
+        help="Optional joblib cache for CV TF-IDF fits; reruns on the same data reuse them.",
+    )
     return parser.parse_args()
 
 
@@ -66,20 +73,32 @@ def main() -> None:
         "max_features": 30000,
     }
 
+    # One TF-IDF fitted on every training post (the role/narrative/risk train
+    # sets are subsets of it) is shared by all three models and the retriever.
+    # CV folds still build their own vectorizers so validation folds stay unseen.
+    logger.info("Fitting shared TF-IDF on %d training posts", len(bundle.retriever_train_posts))
+    shared_tfidf = build_shared_tfidf(tfidf_params)
+    train_matrix = shared_tfidf.fit_transform(bundle.retriever_train_posts["post_text"])
+
     # Role composition model.
     logger.info("Training role composition model on %d samples", len(bundle.role_train))
-    role_model = build_role_model(tfidf_params=tfidf_params)
+    role_model = build_role_model(tfidf_params=tfidf_params, vectorizer=shared_tfidf)
     role_model.fit(bundle.role_train["post_text"], bundle.role_train[ROLE_BUCKETS])
     role_metrics, role_plots = eval_utils.evaluate_role_model(role_model, bundle.role_test, plots_dir)
     role_cv = {}
     if not args.disable_cv:
         logger.info("Running GroupKFold CV for role model")
-        role_cv = eval_utils.run_group_cv_role(lambda: build_role_model(tfidf_params=tfidf_params), bundle.role_train)
+        role_cv = eval_utils.run_group_cv_role(
+            lambda: build_role_model(tfidf_params=tfidf_params, memory=args.cache_dir),
+            bundle.role_train,
+        )
     joblib.dump(role_model, models_dir / "role_model.joblib")
 
     # Narrative model.
     logger.info("Training narrative model on %d samples", len(bundle.narrative_train))
-    narrative_model = build_narrative_model(tfidf_params=tfidf_params, random_state=args.seed)
+    narrative_model = build_narrative_model(
+        tfidf_params=tfidf_params, random_state=args.seed, vectorizer=shared_tfidf
+    )
     narrative_model.fit(bundle.narrative_train["post_text"], bundle.narrative_train[NARRATIVE_LABELS])
     narrative_metrics, narrative_plots, top_terms = eval_utils.evaluate_narrative_model(
         narrative_model,
@@ -91,7 +110,9 @@ def main() -> None:
     if not args.disable_cv:
         logger.info("Running GroupKFold CV for narrative model")
         narrative_cv = eval_utils.run_group_cv_narrative(
-            lambda: build_narrative_model(tfidf_params=tfidf_params, random_state=args.seed),
+            lambda: build_narrative_model(
+                tfidf_params=tfidf_params, random_state=args.seed, memory=args.cache_dir, max_iter=CV_MAX_ITER
+            ),
             bundle.narrative_train,
             threshold=0.5,
         )
@@ -99,21 +120,29 @@ def main() -> None:
 
     # Risk model.
     logger.info("Training risk model on %d samples", len(bundle.risk_train))
-    risk_model = build_risk_model(tfidf_params=tfidf_params, random_state=args.seed)
+    risk_model = build_risk_model(tfidf_params=tfidf_params, random_state=args.seed, vectorizer=shared_tfidf)
     risk_model.fit(bundle.risk_train["post_text"], bundle.risk_train["risk_class_target"])
     risk_metrics, risk_plots = eval_utils.evaluate_risk_model(risk_model, bundle.risk_test, plots_dir)
     risk_cv = {}
     if not args.disable_cv:
         logger.info("Running GroupKFold CV for risk model")
         risk_cv = eval_utils.run_group_cv_risk(
-            lambda: build_risk_model(tfidf_params=tfidf_params, random_state=args.seed),
+            lambda: build_risk_model(
+                tfidf_params=tfidf_params, random_state=args.seed, memory=args.cache_dir, max_iter=CV_MAX_ITER
+            ),
             bundle.risk_train,
         )
     joblib.dump(risk_model, models_dir / "risk_model.joblib")
 
     # Retriever artifacts.
     logger.info("Building TF-IDF retriever index")
-    build_retriever_artifacts(bundle.retriever_train_posts, output_dir=output_dir, tfidf_params=tfidf_params)
+    build_retriever_artifacts(
+        bundle.retriever_train_posts,
+        output_dir=output_dir,
+        tfidf_params=tfidf_params,
+        vectorizer=shared_tfidf,
+        matrix=train_matrix,
+    )
 
     _save_reports(
         reports_dir=reports_dir,
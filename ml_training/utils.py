@@ -3,11 +3,13 @@ from __future__ import annotations
 import json
 import logging
 import random
+import re
 from pathlib import Path
 from typing import Iterable, List, Sequence
 from urllib.parse import urlsplit, urlunsplit
 
 import numpy as np
+import pandas as pd
 
 # Fixed buckets and labels used across training and evaluation.
 ROLE_BUCKETS: List[str] = [
@@ -39,6 +41,10 @@ ROLE_MIN_COMMENTS = 15
 NARRATIVE_MIN_COMMENTS = 5
 NARRATIVE_THRESHOLD = 0.10
 DEFAULT_SEED = 42
+# CV folds only estimate metrics, so their logistic fits get a smaller budget.
+CV_MAX_ITER = 500
+# Below this many scores top_k_indices sorts outright instead of partitioning.
+SMALL_TOP_K = 512
 
 
 def set_seed(seed: int = DEFAULT_SEED) -> None:
@@ -62,6 +68,40 @@ def canonicalize_url(url: str) -> str:
     return urlunsplit((parts.scheme, parts.netloc.lower(), path, "", ""))
 
 
+# scheme://host/path[?query][#fragment] with a plain ASCII host. The host must
+# end at "/", "?", "#" or the end of the string; anything else (non-ASCII hosts,
+# IPv6 brackets, control characters, missing host) goes through urlsplit.
+_SIMPLE_URL = re.compile(
+    r"^([A-Za-z][A-Za-z0-9+.\-]*)://([^\x00-\x20\x7f-\U0010ffff/?#\[\]]+)((?:/[^?#\t\r\n]*)?)(?:[?#][^\t\r\n]*)?$"
+)
+
+
+def canonicalize_urls(urls: pd.Series) -> pd.Series:
+    """
+    Vectorized canonicalize_url over a Series. Each distinct value is
+    canonicalized once; the common scheme://host/path shape is handled with
+    string kernels and the rest falls back to canonicalize_url.
+    """
+    codes, uniques = pd.factorize(urls)
+    distinct = pd.Series(uniques, dtype=object)
+    canonical = pd.Series("", index=distinct.index, dtype=object)
+    is_str = distinct.map(type).eq(str)
+    if is_str.any():
+        parts = distinct[is_str].str.strip().str.extract(_SIMPLE_URL)
+        simple = parts[0].notna()
+        canonical[parts.index[simple]] = (
+            parts.loc[simple, 0].str.lower()
+            + "://"
+            + parts.loc[simple, 1].str.lower()
+            + parts.loc[simple, 2].str.rstrip("/")
+        )
+        rest = parts.index[~simple]
+        canonical[rest] = distinct[rest].map(canonicalize_url)
+    # Missing values are factorized to code -1, which picks the trailing "".
+    values = np.append(canonical.to_numpy(dtype=object), "")
+    return pd.Series(values[codes], index=urls.index, dtype=object)
+
+
 def ensure_columns(df, required: Sequence[str], df_name: str) -> None:
     """Raise a clear error when required columns are missing."""
     missing = [col for col in required if col not in df.columns]
@@ -76,11 +116,40 @@ def drop_empty_text(df, text_col: str):
 
 
 def softmax_rows(arr: np.ndarray) -> np.ndarray:
-    """Apply row-wise softmax with numerical stability."""
-    shifted = arr - np.max(arr, axis=1, keepdims=True)
-    exp_vals = np.exp(shifted)
-    sums = np.clip(exp_vals.sum(axis=1, keepdims=True), 1e-12, None)
-    return exp_vals / sums
+    """Apply row-wise softmax with numerical stability, working in one output buffer."""
+    out = np.array(arr, dtype=np.float64)
+    out -= out.max(axis=1, keepdims=True)
+    np.exp(out, out=out)
+    out /= np.maximum(out.sum(axis=1, keepdims=True), 1e-12)
+    return out
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first (ties keep index order)."""
+    n = scores.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if n <= SMALL_TOP_K:
+        # Short arrays (e.g. one post's few dozen n-gram contributions): one
+        # stable sort is cheaper than partition + tie handling.
+        return np.argsort(-scores, kind="stable")[:k]
+    nan = np.isnan(scores)
+    if nan.any():
+        # Comparisons below skip NaN; rank it after every number, in index
+        # order, as the argsort above does.
+        numeric = np.flatnonzero(~nan)
+        top = numeric[top_k_indices(scores[numeric], k)]
+        return np.concatenate([top, np.flatnonzero(nan)[: k - top.size]])
+    if k < n:
+        # Everything above the k-th largest score, then the earliest ties at it.
+        kth = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth)
+        top = np.concatenate([above, np.flatnonzero(scores == kth)[: k - above.size]])
+        top.sort()
+    else:
+        top = np.arange(n)
+    return top[np.argsort(-scores[top], kind="stable")]
 
 
 def safe_mkdir(path: Path) -> None:
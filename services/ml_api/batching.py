@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BATCH_MAX_SIZE = 32
+
+ScoreFn = Callable[[List[str], Optional[str]], List[Dict[str, Any]]]
+_Item = Tuple[str, Optional[str], "asyncio.Future[Dict[str, Any]]"]
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent /analyze requests into one batch_analyze call.
+
+    Requests queue up while the previous batch is being scored; the worker then
+    drains up to max_size of them (waiting at most timeout_ms for stragglers)
+    and scores each company_hint group with one call on the default executor.
+    """
+
+    def __init__(
+        self,
+        score_fn: ScoreFn,
+        max_size: Optional[int] = None,
+        timeout_ms: Optional[float] = None,
+    ) -> None:
+        self.score_fn = score_fn
+        self.max_size = max_size if max_size is not None else int(os.environ.get("BATCH_MAX_SIZE", BATCH_MAX_SIZE))
+        if timeout_ms is None:
+            timeout_ms = float(os.environ.get("BATCH_TIMEOUT_MS", 0))
+        self.timeout_s = timeout_ms / 1000
+        self._queue: Optional["asyncio.Queue[_Item]"] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 1
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.enabled or self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def submit(self, text: str, company_hint: Optional[str] = None) -> Dict[str, Any]:
+        future: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, company_hint, future))
+        return await future
+
+    async def _collect(self) -> List[_Item]:
+        loop = asyncio.get_running_loop()
+        items = [await self._queue.get()]
+        deadline = loop.time() + self.timeout_s
+        while len(items) < self.max_size:
+            if not self._queue.empty():
+                items.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            groups: Dict[Optional[str], List[_Item]] = {}
+            for item in await self._collect():
+                groups.setdefault(item[1], []).append(item)
+            for company_hint, group in groups.items():
+                texts = [text for text, _, _ in group]
+                try:
+                    results = await loop.run_in_executor(None, self.score_fn, texts, company_hint)
+                except Exception as exc:
+                    if len(group) == 1:
+                        _settle(group[0][2], exc=exc)
+                    else:
+                        # One bad text must not fail the requests it was batched
+                        # with: rescore one by one so only the culprit errors.
+                        await self._run_each(group, company_hint)
+                    continue
+                for (_, _, future), result in zip(group, results):
+                    _settle(future, result=result)
+
+    async def _run_each(self, group: List[_Item], company_hint: Optional[str]) -> None:
+        loop = asyncio.get_running_loop()
+        for text, _, future in group:
+            if future.done():
+                continue
+            try:
+                results = await loop.run_in_executor(None, self.score_fn, [text], company_hint)
+            except Exception as exc:
+                _settle(future, exc=exc)
+                continue
+            _settle(future, result=results[0])
+
+
+def _settle(
+    future: "asyncio.Future[Dict[str, Any]]",
+    result: Optional[Dict[str, Any]] = None,
+    exc: Optional[BaseException] = None,
+) -> None:
+    # Skip requests whose client went away while queued.
+    if future.done():
+        return
+    if exc is not None:
+        future.set_exception(exc)
+    else:
+        future.set_result(result)
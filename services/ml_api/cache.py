@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+CACHE_MAX = 4096
+CACHE_MODES = ("on", "read_only", "write_only", "off")
+
+
+def _cache_size() -> int:
+    size = int(os.environ.get("CACHE_SIZE", CACHE_MAX))
+    if size < 1:
+        raise ValueError(f"CACHE_SIZE must be a positive integer, got {size}")
+    return size
+
+
+def _cache_mode() -> str:
+    mode = os.environ.get("CACHE_MODE", "on").strip().lower()
+    if mode not in CACHE_MODES:
+        raise ValueError(f"CACHE_MODE must be one of {CACHE_MODES}, got {mode!r}")
+    return mode
+
+
+def request_key(post_text: str, company_hint: Optional[str] = None) -> bytes:
+    payload = f"{post_text}\x00{company_hint or ''}".encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+class PredictionCache:
+    """
+    Bounded in-process LRU of analyze() results keyed by an input hash.
+
+    Entries are stored without per-request meta (timestamp, latency, request id);
+    callers stamp those after the lookup. Access is guarded by a lock because
+    sync FastAPI handlers run on a threadpool.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, mode: Optional[str] = None) -> None:
+        self.maxsize = maxsize or _cache_size()
+        self.mode = mode or _cache_mode()
+        self._entries: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        if self.mode not in ("on", "read_only"):
+            return None
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def put(self, key: bytes, result: Dict[str, Any]) -> None:
+        if self.mode not in ("on", "write_only"):
+            return
+        entry = {k: v for k, v in result.items() if k != "meta"}
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
@@ -1,17 +1,45 @@
 from __future__ import annotations
 
-import json
+import os
 import sqlite3
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+from .serialization import dumps
 
 DB_PATH = Path("output") / "history.sqlite"
 
 
-def _ensure_db() -> sqlite3.Connection:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+_local = threading.local()
+
+
+def get_conn() -> sqlite3.Connection:
+    """
+    Return this thread's connection, opening it on first use. Handlers run on a
+    threadpool, so each worker thread gets its own connection rather than all of
+    them sharing one. WAL lets readers proceed while a write is in progress.
+
+    Connections are also tied to the process: with gunicorn --preload the module
+    is imported in the master, and a forked worker must not reuse the master's
+    sqlite handle.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.pid != os.getpid():
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = conn
+        _local.pid = os.getpid()
+    return conn
+
+
+def _ensure_db() -> None:
+    conn = get_conn()
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS runs (
@@ -24,20 +52,25 @@ def _ensure_db() -> sqlite3.Connection:
         )
         """
     )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_created ON runs(created_at_iso)")
     conn.commit()
-    return conn
 
 
-CONN = _ensure_db()
+_ensure_db()
 
 
-def insert_run(
+_INSERT_SQL = """
+INSERT INTO runs (created_at_iso, mode, baseline_text, variant_text, response_json)
+VALUES (?, ?, ?, ?, ?)
+"""
+
+
+def _run_row(
     mode: str,
     response: Dict[str, Any],
     baseline_text: Optional[str] = None,
     variant_text: Optional[str] = None,
-) -> None:
-    conn = CONN
+) -> Tuple[str, str, Optional[str], Optional[str], str]:
     # created_at_iso is NOT NULL. analyze() responses carry meta.timestamp_iso,
     # but compare() (and any future mode) may not — fall back to the current UTC
     # time so persistence never depends on the response shape.
@@ -47,24 +80,32 @@ def insert_run(
         or meta.get("timestamp")
         or datetime.now(timezone.utc).isoformat()
     )
-    conn.execute(
-        """
-        INSERT INTO runs (created_at_iso, mode, baseline_text, variant_text, response_json)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (
-            created_at_iso,
-            mode,
-            baseline_text,
-            variant_text,
-            json.dumps(response),
-        ),
-    )
-    conn.commit()
+    return (created_at_iso, mode, baseline_text, variant_text, dumps(response).decode("utf-8"))
+
+
+def insert_run(
+    mode: str,
+    response: Dict[str, Any],
+    baseline_text: Optional[str] = None,
+    variant_text: Optional[str] = None,
+) -> None:
+    conn = get_conn()
+    with conn:
+        conn.execute(_INSERT_SQL, _run_row(mode, response, baseline_text, variant_text))
+
+
+def insert_runs(records: Iterable[Dict[str, Any]]) -> None:
+    """
+    Insert several runs in one transaction. Each record holds insert_run's
+    keyword arguments (mode, response, and optionally baseline_text/variant_text).
+    """
+    conn = get_conn()
+    with conn:
+        conn.executemany(_INSERT_SQL, [_run_row(**record) for record in records])
 
 
 def fetch_history(limit: int = 50) -> List[Dict[str, Any]]:
-    conn = CONN
+    conn = get_conn()
     cur = conn.execute(
         """
         SELECT id, created_at_iso, mode, baseline_text, variant_text, response_json
@@ -79,8 +120,8 @@ def fetch_history(limit: int = 50) -> List[Dict[str, Any]]:
     for row in rows:
         rid, created, mode, baseline, variant, resp = row
         try:
-            resp_obj = json.loads(resp)
-        except json.JSONDecodeError:
+            resp_obj = orjson.loads(resp)
+        except orjson.JSONDecodeError:
             resp_obj = resp
         results.append(
             {
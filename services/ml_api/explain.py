@@ -4,6 +4,8 @@ import numpy as np
 from typing import Dict, List, Tuple, Optional
 from scipy.sparse import csr_matrix
 
+from ml_training.utils import SMALL_TOP_K, top_k_indices
+
 
 def get_vectorizer(model) -> Optional[object]:
     # Pipelines
@@ -15,9 +17,29 @@ def get_vectorizer(model) -> Optional[object]:
     return None
 
 
-def vectorize(text: str, vectorizer) -> Tuple[csr_matrix, np.ndarray]:
+def same_tfidf(a, b) -> bool:
+    """True when two fitted vectorizers produce identical TF-IDF rows."""
+    # Pipelines trained on a shared vectorizer hold it wrapped in FrozenEstimator.
+    a = getattr(a, "estimator", a)
+    b = getattr(b, "estimator", b)
+    if a is b:
+        return True
+    try:
+        return (
+            a.get_params() == b.get_params()
+            and a.vocabulary_ == b.vocabulary_
+            and np.array_equal(a.idf_, b.idf_)
+        )
+    except AttributeError:
+        return False
+
+
+def vectorize(
+    text: str, vectorizer, feature_names: Optional[np.ndarray] = None
+) -> Tuple[csr_matrix, np.ndarray]:
     vec = vectorizer.transform([text])
-    feature_names = vectorizer.get_feature_names_out()
+    if feature_names is None:
+        feature_names = vectorizer.get_feature_names_out()
     return vec, feature_names
 
 
@@ -27,21 +49,61 @@ def top_contributions_from_vec(
     feature_names: np.ndarray,
     top_k: int,
 ) -> List[Dict[str, float]]:
+    """
+    Top-k n-gram contributions (tfidf * coef) of one post.
+
+    `vec` is the 1-row CSR matrix produced by `vectorizer.transform`, so its
+    data/indices are read directly.
+    """
     if vec.shape[1] != coefs.shape[0]:
         return []
-    vec_csr = vec.tocsr()
-    data = vec_csr.data
-    indices = vec_csr.indices
-    contributions = data * coefs[indices]
+    data = vec.data
+    indices = vec.indices
+    # indices are in range after the shape check, so take() can skip bounds checks.
+    contributions = np.multiply(data, np.take(coefs, indices, mode="clip"))
     if contributions.size == 0:
         return []
-    order = np.argsort(np.abs(contributions))[::-1][:top_k]
+    order = top_k_indices(np.abs(contributions), top_k)
     return [
-        {"ngram": str(feature_names[indices[i]]), "weight": float(contributions[i])}
+        {"ngram": str(feature_names[indices[i]]), "weight": contributions[i]}
         for i in order
     ]
 
 
+def top_contributions_by_row(
+    vec: csr_matrix,
+    coef_matrix: np.ndarray,
+    feature_names: np.ndarray,
+    top_k: int,
+    rows: Optional[List[int]] = None,
+) -> List[List[Dict[str, float]]]:
+    """
+    top_contributions_from_vec for each row of a stacked (n_labels, n_features)
+    coefficient matrix (or just `rows` of it), gathering the post's nonzero
+    columns once for all labels.
+    """
+    n_rows = coef_matrix.shape[0] if rows is None else len(rows)
+    if vec.shape[1] != coef_matrix.shape[1] or vec.nnz == 0:
+        return [[] for _ in range(n_rows)]
+    data = vec.data
+    indices = vec.indices
+    gathered = coef_matrix[:, indices]
+    if rows is not None:
+        gathered = gathered[rows]
+    contributions = gathered * data
+    magnitudes = np.abs(contributions)
+    if indices.size <= SMALL_TOP_K:
+        orders = np.argsort(-magnitudes, axis=1, kind="stable")[:, :top_k].tolist()
+    else:
+        orders = [top_k_indices(row, top_k).tolist() for row in magnitudes]
+    # Plain lists make the per-entry lookups below cheap Python indexing.
+    names = feature_names[indices].tolist()
+    return [
+        [{"ngram": names[i], "weight": row[i]} for i in order]
+        for row, order in zip(contributions.tolist(), orders)
+    ]
+
+
 def choose_risk_coefficients(risk_clf, target_class: str) -> Optional[np.ndarray]:
     """
     Return coefficient vector for a desired class if available.
@@ -2,19 +2,57 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
+import time
 import traceback
-from fastapi import FastAPI, HTTPException, Query
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
+from .batching import MicroBatcher
+from .cache import PredictionCache, request_key
 from .predictor import load_predictor
-from .schemas import AnalyzeRequest, CompareRequest
-from .db import insert_run, fetch_history
+from .serialization import dumps
+from .schemas import (
+    AnalyzeRequest,
+    AnalyzeResponse,
+    BatchAnalyzeRequest,
+    BatchAnalyzeResponse,
+    CompareRequest,
+)
+from .db import insert_run, insert_runs, fetch_history
 
 logger = logging.getLogger("ml_api")
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
-app = FastAPI(title="Lyra ML API", version="0.2.0")
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson's C serializer. Handlers return it
+    directly so FastAPI skips the jsonable_encoder pass over the payload.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if predictor is not None:
+        batcher.start()
+        if not warmup_done.is_set():
+            # Off the event loop so /health can answer 503 while it runs.
+            threading.Thread(target=_warmup, name="warmup", daemon=True).start()
+    yield
+    await batcher.stop()
+
+
+app = FastAPI(title="Lyra ML API", version="0.2.0", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 frontend_origin = os.environ.get("FRONTEND_ORIGIN", "http://localhost:3000")
 allowed_origins = {
@@ -30,6 +68,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Analyze payloads are repetitive JSON (keys, float strings) and compress well.
+app.add_middleware(GZipMiddleware, minimum_size=512)
 
 
 try:
@@ -40,43 +80,141 @@ except Exception as exc:  # pragma: no cover - startup failure path
     logger.error("Failed to load models: %s", exc)
     logger.debug(traceback.format_exc())
 
+prediction_cache = PredictionCache()
+
+# With WARMUP=1 each worker scores a throwaway post after startup and /health
+# answers 503 until it finishes, so orchestrators hold traffic until then.
+warmup_done = threading.Event()
+if os.environ.get("WARMUP", "0") != "1":
+    warmup_done.set()
+
+
+def _warmup() -> None:
+    start = time.perf_counter()
+    try:
+        predictor.warmup()
+        logger.info("Warmup finished in %.0f ms", (time.perf_counter() - start) * 1000)
+    except Exception as exc:
+        # A failed warmup only costs first-request latency; don't hold traffic.
+        logger.warning("Warmup failed: %s", exc)
+    finally:
+        warmup_done.set()
+
+
+def _analyze_cached(texts: List[str], company_hint: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Serve cached results where possible and score the misses in one batch."""
+    start = time.perf_counter()
+    keys = [request_key(text, company_hint) for text in texts]
+    results = [prediction_cache.get(key) for key in keys]
+    misses = [i for i, cached in enumerate(results) if cached is None]
+    for i, cached in enumerate(results):
+        if cached is not None:
+            results[i] = {**cached, "meta": predictor.build_meta(start)}
+    if misses:
+        scored = predictor.batch_analyze([texts[i] for i in misses], company_hint=company_hint)
+        for i, result in zip(misses, scored):
+            prediction_cache.put(keys[i], result)
+            results[i] = result
+    return results
+
+
+batcher = MicroBatcher(_analyze_cached)
+
+
+def _response_body(result: Dict[str, Any], echo: bool) -> Dict[str, Any]:
+    # Cached/batched results are shared, so drop the echo on a shallow copy.
+    if echo:
+        return result
+    return {k: v for k, v in result.items() if k != "input_text"}
+
 
 @app.get("/health")
 def health():
     if predictor is None:
         raise HTTPException(status_code=500, detail="Models not loaded")
-    return {"status": "ok", "models_loaded": True}
+    if not warmup_done.is_set():
+        raise HTTPException(status_code=503, detail="Warming up")
+    return ORJSONResponse(content={"status": "ok", "models_loaded": True})
 
 
-@app.post("/analyze")
-def analyze(request: AnalyzeRequest, save: bool = Query(default=True)):
+# Response schemas are attached through `responses=` for the OpenAPI docs only;
+# without a response_model FastAPI does not re-validate the predictor output.
+# History is written through BackgroundTasks, which run after the response has
+# been sent, so the sqlite insert/commit is not part of request latency.
+# Concurrent /analyze calls are coalesced by the micro-batcher; without it
+# (BATCH_MAX_SIZE<=1, or no lifespan) each request is scored on its own.
+@app.post("/analyze", responses={200: {"model": AnalyzeResponse}})
+async def analyze(
+    request: AnalyzeRequest,
+    background_tasks: BackgroundTasks,
+    save: bool = Query(default=True),
+    echo: bool = Query(default=True),
+):
     if predictor is None:
         raise HTTPException(status_code=500, detail="Models not loaded")
     try:
-        result = predictor.analyze(request)
+        if batcher.running:
+            result = await batcher.submit(request.post_text, request.company_hint)
+        else:
+            (result,) = await run_in_threadpool(_analyze_cached, [request.post_text], request.company_hint)
         if save:
-            insert_run(mode="analyze", response=result, baseline_text=request.post_text)
-        return JSONResponse(content=result)
+            background_tasks.add_task(
+                insert_run, mode="analyze", response=result, baseline_text=request.post_text
+            )
+        return ORJSONResponse(content=_response_body(result, echo))
     except Exception as exc:
         logger.error("Prediction failed: %s", exc)
         logger.debug(traceback.format_exc())
         raise HTTPException(status_code=500, detail="Prediction failed")
 
 
+@app.post("/analyze/batch", responses={200: {"model": BatchAnalyzeResponse}})
+def analyze_batch(
+    request: BatchAnalyzeRequest,
+    background_tasks: BackgroundTasks,
+    save: bool = Query(default=True),
+    echo: bool = Query(default=True),
+):
+    if predictor is None:
+        raise HTTPException(status_code=500, detail="Models not loaded")
+    try:
+        results = _analyze_cached(request.post_texts, request.company_hint)
+        if save:
+            background_tasks.add_task(
+                insert_runs,
+                [
+                    {"mode": "analyze", "response": result, "baseline_text": text}
+                    for text, result in zip(request.post_texts, results)
+                ],
+            )
+        body = [_response_body(result, echo) for result in results]
+        return ORJSONResponse(content={"results": body, "count": len(body)})
+    except Exception as exc:
+        logger.error("Batch prediction failed: %s", exc)
+        logger.debug(traceback.format_exc())
+        raise HTTPException(status_code=500, detail="Batch prediction failed")
+
+
 @app.post("/analyze/compare")
-def compare(request: CompareRequest, save: bool = Query(default=True)):
+def compare(
+    request: CompareRequest,
+    background_tasks: BackgroundTasks,
+    save: bool = Query(default=True),
+):
     if predictor is None:
         raise HTTPException(status_code=500, detail="Models not loaded")
     try:
-        result = predictor.compare(request.baseline_text, request.variant_text)
+        baseline, variant = _analyze_cached([request.baseline_text, request.variant_text])
+        result = predictor.compare_results(baseline, variant)
         if save:
-            insert_run(
+            background_tasks.add_task(
+                insert_run,
                 mode="compare",
                 response=result,
                 baseline_text=request.baseline_text,
                 variant_text=request.variant_text,
             )
-        return JSONResponse(content=result)
+        return ORJSONResponse(content=result)
     except Exception as exc:
         logger.error("Compare failed: %s", exc)
         logger.debug(traceback.format_exc())
@@ -87,7 +225,7 @@ def compare(request: CompareRequest, save: bool = Query(default=True)):
 def history(limit: int = Query(default=50, ge=1, le=200)):
     try:
         rows = fetch_history(limit=limit)
-        return JSONResponse(content={"rows": rows, "count": len(rows)})
+        return ORJSONResponse(content={"rows": rows, "count": len(rows)})
     except Exception as exc:
         logger.error("History fetch failed: %s", exc)
         logger.debug(traceback.format_exc())
@@ -97,4 +235,25 @@ def history(limit: int = Query(default=50, ge=1, le=200)):
 if __name__ == "__main__":  # pragma: no cover
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("PORT", 8000)))
+    # Unlike the gunicorn --preload deployment in RENDER_DEPLOY.md, where
+    # workers share the master's models copy-on-write, uvicorn's workers each
+    # re-import this module and load their own copy of the models, so raise
+    # WEB_CONCURRENCY here only after checking memory. uvicorn needs an import
+    # string to start workers; a single worker reuses the app already loaded
+    # in this process.
+    # UVICORN_LIMIT_CONCURRENCY caps in-flight connections per worker; past it
+    # uvicorn answers 503 instead of queueing, so clients can retry with backoff.
+    workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+    limit_concurrency = os.environ.get("UVICORN_LIMIT_CONCURRENCY")
+    uvicorn.run(
+        app if workers == 1 else "services.ml_api.main:app",
+        host="0.0.0.0",
+        port=int(os.environ.get("PORT", 8000)),
+        workers=workers,
+        limit_concurrency=int(limit_concurrency) if limit_concurrency else None,
+        backlog=int(os.environ.get("UVICORN_BACKLOG", 2048)),
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+        log_level="warning",
+    )
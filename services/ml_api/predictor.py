@@ -1,28 +1,50 @@
 from __future__ import annotations
 
+import heapq
+import itertools
 import json
 import os
+import secrets
 import time
-import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import joblib
 import numpy as np
-import pandas as pd
 from scipy.special import softmax
 from scipy.sparse import csr_matrix
-from scipy.sparse import load_npz
-from sklearn.metrics.pairwise import cosine_similarity
+
+from ml_training.utils import top_k_indices
 
 from .schemas import AnalyzeRequest
 from .explain import (
     choose_risk_coefficients,
     get_vectorizer,
+    same_tfidf,
+    top_contributions_by_row,
     top_contributions_from_vec,
     vectorize,
 )
 
+HARMFUL_NARRATIVES = ("toxic_culture", "elitism", "credibility_overclaim", "culture_misalignment")
+
+# (epoch second, formatted ISO string); replaced as a whole so threads never
+# see a half-updated pair.
+_last_timestamp: Tuple[int, str] = (0, "")
+
+
+def _timestamp_iso() -> str:
+    """Current UTC time as ISO-8601, formatted at most once per second."""
+    global _last_timestamp
+    now = int(time.time())
+    second, text = _last_timestamp
+    if second != now:
+        text = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+        _last_timestamp = (now, text)
+    return text
+
 
 class Predictor:
     def __init__(self, model_dir: Path) -> None:
@@ -43,7 +65,21 @@ class Predictor:
         self.risk_model = self._load_artifact("risk_model.joblib")
 
         self.top_ngrams = self._load_top_ngrams()
-        self.retriever = self._load_retriever()
+        self.shared_tfidf = self._load_shared_vectorizer()
+        # PARALLEL_PREDICT=1 runs the three model predictions concurrently; it
+        # pays off only with spare cores, since each call is partly GIL-bound.
+        self._predict_pool: Optional[ThreadPoolExecutor] = None
+        if os.environ.get("PARALLEL_PREDICT", "0") == "1":
+            self._predict_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="predict")
+        self._prepare_explain()
+        self._harmful_mask = self._label_mask(HARMFUL_NARRATIVES)
+        self._burnout_mask = self._label_mask(("burnout",))
+        self._prepare_shared_tfidf()
+        self._role_needs_softmax = self._probe_role_softmax()
+        # request_id = random per-process prefix + counter: unique across workers
+        # and restarts without generating a UUID per request. Seeded lazily per
+        # pid, since gunicorn --preload builds the predictor in the master.
+        self._request_ids: Tuple[int, str, "itertools.count[int]"] = (0, "", itertools.count(1))
 
     def _load_metadata(self) -> Dict:
         path = self.model_dir / "metadata.json"
@@ -65,145 +101,254 @@ class Predictor:
             raise FileNotFoundError(f"Missing artifact: {path}")
         return joblib.load(path)
 
-    def _load_retriever(self):
-        vec_path = self.model_dir / "shared_tfidf.joblib"
-        mat_path = self.model_dir / "train_tfidf_matrix.npz"
-        idx_path = self.model_dir / "train_post_index.csv"
-        if not (vec_path.exists() and mat_path.exists() and idx_path.exists()):
+    def _load_shared_vectorizer(self):
+        path = self.model_dir / "shared_tfidf.joblib"
+        if not path.exists():
             return None
-        vectorizer = joblib.load(vec_path)
-        matrix = load_npz(mat_path)
-        index_df = pd.read_csv(idx_path)
-        return {"vectorizer": vectorizer, "matrix": matrix, "index": index_df}
-
-    def _role_distribution(self, text: str) -> Dict[str, float]:
-        raw_preds = self.role_model.predict([text]).reshape(1, -1)
-        if np.any(raw_preds < 0) or not np.isclose(raw_preds.sum(axis=1), 1.0).all():
-            probs = softmax(raw_preds, axis=1)
-        else:
-            probs = raw_preds
-        dist = {bucket: float(probs[0, idx]) for idx, bucket in enumerate(self.role_buckets)}
-        return dist
+        return joblib.load(path)
 
-    def _narratives(self, text: str) -> Dict[str, Dict[str, object]]:
-        probs = np.asarray(self.narrative_model.predict_proba([text]))
-        results: Dict[str, Dict[str, object]] = {}
-        for idx, label in enumerate(self.narrative_labels):
-            prob = float(probs[0, idx])
-            flag = prob >= 0.10
-            results[label] = {"prob": prob, "flag": flag}
-        return results
+    def _prepare_explain(self) -> None:
+        """
+        Resolve each model's vectorizer, feature names and coefficient vectors
+        once; the evidence methods reuse them on every request.
+        """
+        self._risk_vec = self._vectorizer_with_names(self.risk_model)
+        self._narr_vec = self._vectorizer_with_names(self.narrative_model)
+        self._role_vec = self._vectorizer_with_names(self.role_model)
+
+        risk_clf = self.risk_model.named_steps.get("clf") if hasattr(self.risk_model, "named_steps") else None
+        self._risk_coefs = choose_risk_coefficients(risk_clf, "Harmful") if risk_clf is not None else None
 
-    def _risk_model_preds(self, text: str) -> Tuple[Dict[str, float], str]:
-        probs = np.asarray(self.risk_model.predict_proba([text]))[0]
+        # Per-label coefficients are stacked into (n_labels, n_features) matrices
+        # so one gather over a post's nonzero columns serves every label.
+        narr_coefs: Dict[str, np.ndarray] = {}
+        clf = self.narrative_model.named_steps.get("clf") if hasattr(self.narrative_model, "named_steps") else None
+        if clf is not None and hasattr(clf, "estimators_"):
+            for label, est in zip(self.narrative_labels, clf.estimators_):
+                if hasattr(est, "coef_"):
+                    narr_coefs[label] = np.asarray(est.coef_).ravel()
+        self._narr_coef_labels = list(narr_coefs)
+        self._narr_coef_matrix = np.vstack(list(narr_coefs.values())) if narr_coefs else None
+
+        role_coefs: Dict[str, np.ndarray] = {}
+        pipeline = self.role_model.pipeline if hasattr(self.role_model, "pipeline") else None
+        model = pipeline.named_steps.get("model") if pipeline is not None else None
+        if model is not None and hasattr(model, "estimators_"):
+            for bucket, est in zip(self.role_buckets, model.estimators_):
+                if hasattr(est, "coef_"):
+                    role_coefs[bucket] = np.asarray(est.coef_).ravel()
+        self._role_coef_rows = {bucket: i for i, bucket in enumerate(role_coefs)}
+        self._role_coef_matrix = np.vstack(list(role_coefs.values())) if role_coefs else None
+
+    def _prepare_shared_tfidf(self) -> None:
+        """
+        Models whose TF-IDF step matches shared_tfidf.joblib are scored
+        from one shared transform per batch; the rest vectorize through their
+        own pipeline. SHARED_TFIDF=0 forces the per-pipeline path.
+        """
+        self._shared_vec = None
+        self._shared_models: set = set()
+        if self.shared_tfidf is None or os.environ.get("SHARED_TFIDF", "1") == "0":
+            return
+        shared = self.shared_tfidf
+        views = {"risk": self._risk_vec, "narrative": self._narr_vec}
+        if hasattr(self.role_model, "pipeline"):
+            views["role"] = self._role_vec
+        for name, view in views.items():
+            if view is not None and same_tfidf(view[0], shared):
+                self._shared_models.add(name)
+        if self._shared_models:
+            self._shared_vec = shared
+
+    def _explain_input(self, text: str, name: str, view, row: Optional[csr_matrix]):
+        vec, names = view
+        if row is not None and name in self._shared_models:
+            return row, names
+        return vectorize(text, vec, names)
+
+    @staticmethod
+    def _vectorizer_with_names(model) -> Optional[Tuple[object, np.ndarray]]:
+        vec = get_vectorizer(model)
+        if vec is None:
+            return None
+        return vec, vec.get_feature_names_out()
+
+    def _probe_role_softmax(self) -> bool:
+        """
+        Whether role_model.predict returns raw scores rather than a distribution.
+        That is fixed for a fitted model, so it is probed once at load instead of
+        being re-checked on every prediction.
+        """
+        try:
+            probe = np.asarray(self.role_model.predict([""])).reshape(1, -1)
+        except Exception:
+            return True
+        return bool(np.any(probe < 0) or not np.isclose(probe.sum(), 1.0))
+
+    def _role_distribution(self, texts: List[str], X: Optional[csr_matrix] = None) -> np.ndarray:
+        """Role probabilities, one row per text in role_buckets order."""
+        if X is not None and "role" in self._shared_models:
+            # RoleCompositionModel.predict softmaxes the ridge outputs itself.
+            raw = self.role_model.pipeline.named_steps["model"].predict(X)
+            return softmax(np.asarray(raw), axis=1)
+        raw_preds = np.asarray(self.role_model.predict(texts)).reshape(len(texts), -1)
+        return softmax(raw_preds, axis=1) if self._role_needs_softmax else raw_preds
+
+    def _label_mask(self, labels) -> int:
+        """Bitmask of the given narrative labels, by position in narrative_labels."""
+        mask = 0
+        for idx, label in enumerate(self.narrative_labels):
+            if label in labels:
+                mask |= 1 << idx
+        return mask
+
+    def _narratives(
+        self, texts: List[str], X: Optional[csr_matrix] = None
+    ) -> Tuple[List[Dict[str, Dict[str, object]]], List[int]]:
+        """Per-text narrative probs/flags, plus each text's flags as a bitmask."""
+        if X is not None and "narrative" in self._shared_models:
+            probs = np.asarray(self.narrative_model.named_steps["clf"].predict_proba(X))
+        else:
+            probs = np.asarray(self.narrative_model.predict_proba(texts))
+        batch: List[Dict[str, Dict[str, object]]] = []
+        masks: List[int] = []
+        for row in probs:
+            results: Dict[str, Dict[str, object]] = {}
+            flag_mask = 0
+            for idx, label in enumerate(self.narrative_labels):
+                prob = row[idx]
+                flag = prob >= 0.10
+                if flag:
+                    flag_mask |= 1 << idx
+                results[label] = {"prob": prob, "flag": flag}
+            batch.append(results)
+            masks.append(flag_mask)
+        return batch, masks
+
+    def _risk_model_preds(self, texts: List[str], X: Optional[csr_matrix] = None) -> List[Tuple[Dict[str, float], str]]:
+        if X is not None and "risk" in self._shared_models:
+            all_probs = np.asarray(self.risk_model.named_steps["clf"].predict_proba(X))
+        else:
+            all_probs = np.asarray(self.risk_model.predict_proba(texts))
         model_classes = list(getattr(self.risk_model, "classes_", ["Helpful", "Harmless", "Harmful"]))
         expected_classes = ["Helpful", "Harmless", "Harmful"]
-        prob_map = {label: 0.0 for label in expected_classes}
-        for cls, prob in zip(model_classes, probs):
-            prob_map[str(cls)] = float(prob)
-        pred_idx = int(np.argmax(probs))
-        pred = str(model_classes[pred_idx]) if model_classes else "Helpful"
-        return prob_map, pred
-
-    def _risk_rule_based(self, narratives: Dict[str, Dict[str, object]]) -> str:
-        harmful_labels = {"toxic_culture", "elitism", "credibility_overclaim", "culture_misalignment"}
-        if any(narratives.get(lbl, {}).get("flag") for lbl in harmful_labels):
+        batch: List[Tuple[Dict[str, float], str]] = []
+        for probs in all_probs:
+            prob_map = {label: 0.0 for label in expected_classes}
+            for cls, prob in zip(model_classes, probs):
+                prob_map[str(cls)] = prob
+            pred_idx = int(np.argmax(probs))
+            pred = str(model_classes[pred_idx]) if model_classes else "Helpful"
+            batch.append((prob_map, pred))
+        return batch
+
+    def _risk_rule_based(self, flag_mask: int) -> str:
+        if flag_mask & self._harmful_mask:
             return "Harmful"
-        if narratives.get("burnout", {}).get("flag"):
+        if flag_mask & self._burnout_mask:
             return "Harmless"
         return "Helpful"
 
-    def _similar_posts(self, text: str, k: int = 5) -> List[Dict[str, object]]:
-        if not self.retriever:
-            return []
-        vectorizer = self.retriever["vectorizer"]
-        matrix: csr_matrix = self.retriever["matrix"]
-        index_df: pd.DataFrame = self.retriever["index"]
-        query_vec = vectorizer.transform([text])
-        sims = cosine_similarity(query_vec, matrix).ravel()
-        top_idx = np.argsort(sims)[::-1][:k]
-        results: List[Dict[str, object]] = []
-        for idx in top_idx:
-            row = index_df.iloc[int(idx)]
-            results.append(
-                {
-                    "company": row.get("company", ""),
-                    "post_url": row.get("post_url", ""),
-                    "post_text_snippet": str(row.get("post_url", ""))[:160],
-                    "score": float(sims[idx]),
-                }
-            )
-        return results
-
-    def _risk_top_ngrams(self, text: str, probs: Dict[str, float]) -> List[Dict[str, float]]:
-        vec = get_vectorizer(self.risk_model)
-        if vec is None:
-            return []
-        risk_clf = self.risk_model.named_steps.get("clf") if hasattr(self.risk_model, "named_steps") else None
-        if risk_clf is None:
+    def _risk_top_ngrams(
+        self, text: str, probs: Dict[str, float], row: Optional[csr_matrix] = None
+    ) -> List[Dict[str, float]]:
+        if self._risk_vec is None or self._risk_coefs is None:
             return []
-        coefs = choose_risk_coefficients(risk_clf, "Harmful")
-        if coefs is None:
+        vec_mat, feature_names = self._explain_input(text, "risk", self._risk_vec, row)
+        if vec_mat.nnz == 0:
             return []
-        vec_mat, feature_names = vectorize(text, vec)
-        return top_contributions_from_vec(vec_mat, coefs, feature_names, top_k=8)
+        return top_contributions_from_vec(vec_mat, self._risk_coefs, feature_names, top_k=8)
 
-    def _narrative_top_ngrams(self, text: str) -> Dict[str, List[Dict[str, float]]]:
-        vec = get_vectorizer(self.narrative_model)
-        if vec is None:
-            return {}
-        clf = self.narrative_model.named_steps.get("clf") if hasattr(self.narrative_model, "named_steps") else None
-        if clf is None or not hasattr(clf, "estimators_"):
-            return {}
-        vec_mat, feature_names = vectorize(text, vec)
-        out: Dict[str, List[Dict[str, float]]] = {}
-        for label, est in zip(self.narrative_labels, clf.estimators_):
-            if not hasattr(est, "coef_"):
-                continue
-            coefs = np.asarray(est.coef_).ravel()
-            out[label] = top_contributions_from_vec(vec_mat, coefs, feature_names, top_k=6)
-        return out
-
-    def _role_top_ngrams(self, text: str, top_roles: List[str]) -> Dict[str, List[Dict[str, float]]]:
-        vec = get_vectorizer(self.role_model)
-        if vec is None:
-            return {}
-        pipeline = self.role_model.pipeline if hasattr(self.role_model, "pipeline") else None
-        if pipeline is None:
+    def _narrative_top_ngrams(self, text: str, row: Optional[csr_matrix] = None) -> Dict[str, List[Dict[str, float]]]:
+        if self._narr_vec is None or self._narr_coef_matrix is None:
             return {}
-        model = pipeline.named_steps.get("model")
-        if model is None or not hasattr(model, "estimators_"):
+        vec_mat, feature_names = self._explain_input(text, "narrative", self._narr_vec, row)
+        # Posts with no vocabulary hits come back as empty lists without any gather.
+        tops = top_contributions_by_row(vec_mat, self._narr_coef_matrix, feature_names, top_k=6)
+        return dict(zip(self._narr_coef_labels, tops))
+
+    def _role_top_ngrams(
+        self, text: str, top_roles: List[str], row: Optional[csr_matrix] = None
+    ) -> Dict[str, List[Dict[str, float]]]:
+        if self._role_vec is None or self._role_coef_matrix is None:
             return {}
-        vec_mat, feature_names = vectorize(text, vec)
-        out: Dict[str, List[Dict[str, float]]] = {}
-        bucket_to_est = {self.role_buckets[i]: est for i, est in enumerate(model.estimators_)}
-        for role in top_roles:
-            est = bucket_to_est.get(role)
-            if est is None or not hasattr(est, "coef_"):
-                continue
-            coefs = np.asarray(est.coef_).ravel()
-            out[role] = top_contributions_from_vec(vec_mat, coefs, feature_names, top_k=6)
-        return out
-
-    def _entropy(self, dist: Dict[str, float]) -> float:
-        probs = np.clip(np.array(list(dist.values())), 1e-12, 1.0)
+        vec_mat, feature_names = self._explain_input(text, "role", self._role_vec, row)
+        roles = [role for role in top_roles if role in self._role_coef_rows]
+        rows = [self._role_coef_rows[role] for role in roles]
+        tops = top_contributions_by_row(vec_mat, self._role_coef_matrix, feature_names, top_k=6, rows=rows)
+        return dict(zip(roles, tops))
+
+    def _entropy(self, role_row: np.ndarray) -> float:
+        probs = np.clip(role_row, 1e-12, 1.0)
         probs = probs / probs.sum()
         return float(-np.sum(probs * np.log2(probs)))
 
     def analyze(self, request: AnalyzeRequest) -> Dict[str, object]:
-        start = time.time()
-        text = request.post_text.strip()
-        if not text:
+        return self.batch_analyze([request.post_text], company_hint=request.company_hint)[0]
+
+    def warmup(self) -> None:
+        """
+        Score one throwaway post so first-call costs (BLAS/sklearn setup, lazy
+        numpy paths, the predict pool's threads) are paid before real traffic.
+        Runs per worker process, so it is called from the API lifespan rather
+        than here in __init__, which gunicorn --preload runs in the master.
+        """
+        self.analyze(AnalyzeRequest(post_text="warmup"))
+
+    def batch_analyze(self, texts: List[str], company_hint: Optional[str] = None) -> List[Dict[str, object]]:
+        """
+        Score several posts with one predict call per model; the per-text
+        evidence extraction still runs row by row.
+        """
+        start = time.perf_counter()
+        texts = [t.strip() for t in texts]
+        if not texts or not all(texts):
             raise ValueError("post_text cannot be empty or whitespace")
 
-        narratives = self._narratives(text)
-        role_dist = self._role_distribution(text)
-        role_all = [{"role": k, "pct": round(v * 100, 4)} for k, v in role_dist.items()]
-        role_top5 = sorted(role_all, key=lambda x: x["pct"], reverse=True)[:5]
-        entropy_val = self._entropy(role_dist)
-
-        risk_probs, risk_pred = self._risk_model_preds(text)
-        rule_based = self._risk_rule_based(narratives)
+        # One TF-IDF pass feeds every model (and its evidence) that shares the vectorizer.
+        X = self._shared_vec.transform(texts) if self._shared_vec is not None else None
+        if self._predict_pool is not None:
+            narr_future = self._predict_pool.submit(self._narratives, texts, X)
+            role_future = self._predict_pool.submit(self._role_distribution, texts, X)
+            risk_future = self._predict_pool.submit(self._risk_model_preds, texts, X)
+            narratives, flag_masks = narr_future.result()
+            role_dists = role_future.result()
+            risk_preds = risk_future.result()
+        else:
+            narratives, flag_masks = self._narratives(texts, X)
+            role_dists = self._role_distribution(texts, X)
+            risk_preds = self._risk_model_preds(texts, X)
+        return [
+            self._build_response(
+                text,
+                company_hint,
+                narratives[i],
+                flag_masks[i],
+                role_dists[i],
+                risk_preds[i][0],
+                start,
+                row=X[i] if X is not None else None,
+            )
+            for i, text in enumerate(texts)
+        ]
+
+    def _build_response(
+        self,
+        text: str,
+        company_hint: Optional[str],
+        narratives: Dict[str, Dict[str, object]],
+        flag_mask: int,
+        role_row: np.ndarray,
+        risk_probs: Dict[str, float],
+        start: float,
+        row: Optional[csr_matrix] = None,
+    ) -> Dict[str, object]:
+        pcts = [round(v * 100, 4) for v in role_row.tolist()]
+        role_all = [{"role": role, "pct": pct} for role, pct in zip(self.role_buckets, pcts)]
+        role_top5 = [role_all[i] for i in top_k_indices(np.asarray(pcts[: len(role_all)]), 5)]
+        entropy_val = self._entropy(role_row)
+
+        rule_based = self._risk_rule_based(flag_mask)
         max_prob = max(risk_probs.values()) if risk_probs else 0.0
         if max_prob >= 0.75:
             risk_level = "High"
@@ -212,20 +357,17 @@ class Predictor:
         else:
             risk_level = "Low"
 
-        risk_top = self._risk_top_ngrams(text, risk_probs)
-        narrative_top = self._narrative_top_ngrams(text)
-        role_top = self._role_top_ngrams(text, [r["role"] for r in role_top5])
+        risk_top = self._risk_top_ngrams(text, risk_probs, row)
+        narrative_top = self._narrative_top_ngrams(text, row)
+        role_top = self._role_top_ngrams(text, [r["role"] for r in role_top5], row)
 
         primary_reason = "No strong harmful signals."
         if risk_top:
             primary_reason = f"Top harmful driver: {risk_top[0]['ngram']} ({risk_top[0]['weight']:+.3f})"
 
-        latency_ms = int((time.time() - start) * 1000)
-        timestamp_iso = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-
         response = {
             "input_text": text,
-            "audience": request.company_hint or None,
+            "audience": company_hint or None,
             "role_distribution_top5": role_top5,
             "role_distribution_all": role_all,
             "confidence_entropy": entropy_val,
@@ -244,27 +386,41 @@ class Predictor:
                 "narrative_top_ngrams": narrative_top,
                 "role_top_ngrams": role_top,
             },
-            "meta": {
-                "model_dir_used": str(self.model_dir),
-                "timestamp_iso": timestamp_iso,
-                "latency_ms": latency_ms,
-                "request_id": str(uuid.uuid4()),
-            },
+            "meta": self.build_meta(start),
         }
         return response
 
+    def build_meta(self, start: float) -> Dict[str, object]:
+        """
+        Per-request meta block; kept separate so cached results can be re-stamped.
+        `start` is a time.perf_counter() reading.
+        """
+        return {
+            "model_dir_used": str(self.model_dir),
+            "timestamp_iso": _timestamp_iso(),
+            "latency_ms": int((time.perf_counter() - start) * 1000),
+            "request_id": self._next_request_id(),
+        }
+
+    def _next_request_id(self) -> str:
+        pid, prefix, counter = self._request_ids
+        if pid != os.getpid():
+            # First request in this process (e.g. a freshly forked worker). The
+            # triple is swapped in one assignment so racing threads each use a
+            # consistent prefix/counter pair.
+            pid, prefix, counter = os.getpid(), secrets.token_hex(6), itertools.count(1)
+            self._request_ids = (pid, prefix, counter)
+        return f"{prefix}-{next(counter):x}"
+
     def compare(self, baseline_text: str, variant_text: str) -> Dict[str, object]:
-        baseline_req = AnalyzeRequest(post_text=baseline_text)
-        variant_req = AnalyzeRequest(post_text=variant_text)
-        baseline = self.analyze(baseline_req)
-        variant = self.analyze(variant_req)
+        baseline, variant = self.batch_analyze([baseline_text, variant_text])
+        return self.compare_results(baseline, variant)
 
+    def compare_results(self, baseline: Dict[str, object], variant: Dict[str, object]) -> Dict[str, object]:
+        """Build the compare payload from two analyze() results."""
+        variant_pct = {v["role"]: v["pct"] for v in variant["role_distribution_all"]}
         role_delta = {
-            entry["role"]: round(
-                next((v["pct"] for v in variant["role_distribution_all"] if v["role"] == entry["role"]), 0.0)
-                - entry["pct"],
-                4,
-            )
+            entry["role"]: round(variant_pct.get(entry["role"], 0.0) - entry["pct"], 4)
             for entry in baseline["role_distribution_all"]
         }
         risk_delta = {
@@ -290,14 +446,13 @@ class Predictor:
     def _compare_top_phrases(
         self, baseline_phrases: List[Dict[str, float]], variant_phrases: List[Dict[str, float]]
     ) -> List[Dict[str, float]]:
-        merged: Dict[str, float] = {}
+        merged: Dict[str, float] = defaultdict(float)
         for item in baseline_phrases:
-            merged[item["ngram"]] = merged.get(item["ngram"], 0.0) - item["weight"]
+            merged[item["ngram"]] -= item["weight"]
         for item in variant_phrases:
-            merged[item["ngram"]] = merged.get(item["ngram"], 0.0) + item["weight"]
-        items = [{"ngram": k, "weight": v} for k, v in merged.items()]
-        items.sort(key=lambda x: abs(x["weight"]), reverse=True)
-        return items[:10]
+            merged[item["ngram"]] += item["weight"]
+        top = heapq.nlargest(10, merged.items(), key=lambda kv: abs(kv[1]))
+        return [{"ngram": k, "weight": v} for k, v in top]
 
 
 def load_predictor() -> Predictor:
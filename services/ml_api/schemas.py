@@ -1,33 +1,41 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
-from pydantic import BaseModel, Field, validator
+from typing import Annotated, Dict, List, Optional
+from pydantic import AfterValidator, BaseModel, Field
+
+
+def _clean_text(v: str) -> str:
+    # str.strip() rather than StringConstraints(strip_whitespace=True): pydantic
+    # leaves some characters Python treats as whitespace (e.g. U+001C-U+001F),
+    # which would then pass validation and fail in the predictor.
+    cleaned = v.strip()
+    if not cleaned:
+        raise ValueError("text cannot be empty or whitespace")
+    return cleaned
+
+
+# Trimmed and required to be non-empty.
+PostText = Annotated[str, AfterValidator(_clean_text)]
 
 
 class AnalyzeRequest(BaseModel):
-    post_text: str = Field(..., min_length=1)
+    post_text: PostText
     company_hint: Optional[str] = None
     variant_id: Optional[str] = Field(default=None, pattern="^(A|B)$")
     user_id: Optional[str] = None
 
-    @validator("post_text")
-    def trim_text(cls, v: str) -> str:
-        cleaned = v.strip()
-        if not cleaned:
-            raise ValueError("post_text cannot be empty or whitespace")
-        return cleaned
-
 
 class CompareRequest(BaseModel):
-    baseline_text: str
-    variant_text: str
+    baseline_text: PostText
+    variant_text: PostText
+
 
-    @validator("baseline_text", "variant_text")
-    def trim(cls, v: str) -> str:
-        cleaned = v.strip()
-        if not cleaned:
-            raise ValueError("text cannot be empty or whitespace")
-        return cleaned
+MAX_BATCH_SIZE = 64
+
+
+class BatchAnalyzeRequest(BaseModel):
+    post_texts: List[PostText] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+    company_hint: Optional[str] = None
 
 
 class Contribution(BaseModel):
@@ -36,7 +44,7 @@ class Contribution(BaseModel):
 
 
 class AnalyzeResponse(BaseModel):
-    input_text: str
+    input_text: Optional[str] = None
     audience: Optional[str]
     role_distribution_top5: List[Dict[str, float]]
     role_distribution_all: List[Dict[str, float]]
@@ -45,3 +53,8 @@ class AnalyzeResponse(BaseModel):
     narratives: Dict[str, object]
     evidence: Dict[str, object]
     meta: Dict[str, object]
+
+
+class BatchAnalyzeResponse(BaseModel):
+    results: List[AnalyzeResponse]
+    count: int
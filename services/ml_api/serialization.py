@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+import orjson
+
+# Predictor output keeps numpy scalars (float64 probabilities, bool_ flags)
+# instead of casting each one; OPT_SERIALIZE_NUMPY writes them natively.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _orjson_default(obj: Any) -> Any:
+    # numpy scalars that OPT_SERIALIZE_NUMPY does not cover (e.g. np.str_).
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize API payloads (responses and logged runs) with orjson."""
+    return orjson.dumps(obj, default=_orjson_default, option=ORJSON_OPTIONS)
@@ -0,0 +1,42 @@
+import random
+
+import pandas as pd
+import pytest
+
+from ml_training.utils import canonicalize_url, canonicalize_urls
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://www.LinkedIn.com/posts/Some-Post/",
+        "HTTPS://WWW.LINKEDIN.COM/feed/update/urn:li:activity:1?utm_source=x#top",
+        "https://www.linkedin.com",
+        "https://www.linkedin.com?x=1",
+        "https://www.linkedin.com#frag",
+        "  https://www.linkedin.com/posts/a//  ",
+        "https://MÜNCHEN.de/Posts/",
+        "https://ex ample.com/Path",
+        "https://exa\tmple.com/Path",
+        "https://user:PW@Example.com:8080/Path/",
+        "linkedin.com/posts/a",
+        "not a url",
+        "",
+        "   ",
+        None,
+        float("nan"),
+    ],
+)
+def test_canonicalize_urls_matches_scalar(url):
+    assert canonicalize_urls(pd.Series([url])).tolist() == [canonicalize_url(url)]
+
+
+def test_canonicalize_urls_matches_scalar_on_random_inputs():
+    rng = random.Random(0)
+    alphabet = list("aZ09/.:?#@%- \t\r\nÜé\x00\x7f")
+    prefixes = ["https://", "HTTP://", "https://www.LinkedIn.com/", "https://MÜNCHEN.de", "ftp://", ""]
+    urls = [
+        rng.choice(prefixes) + "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 15)))
+        for _ in range(20000)
+    ]
+    assert canonicalize_urls(pd.Series(urls)).tolist() == [canonicalize_url(url) for url in urls]
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from ml_training.utils import SMALL_TOP_K, top_k_indices
+
+
+@pytest.mark.parametrize("n", [5, SMALL_TOP_K, SMALL_TOP_K + 1, 2000])
+def test_top_k_indices_matches_stable_argsort(n):
+    rng = np.random.default_rng(n)
+    for _ in range(50):
+        scores = rng.integers(0, 5, n).astype(float)
+        scores[rng.random(n) < rng.random()] = np.nan
+        scores[rng.random(n) < 0.05] = -np.inf
+        scores[rng.random(n) < 0.05] = np.inf
+        k = int(rng.integers(0, n + 3))
+        expected = np.argsort(-scores, kind="stable")[:k]
+        np.testing.assert_array_equal(top_k_indices(scores, k), expected)
+
+
+@pytest.mark.parametrize("n", [10, 2000])
+def test_top_k_indices_all_nan_returns_k(n):
+    np.testing.assert_array_equal(top_k_indices(np.full(n, np.nan), 5), np.arange(5))